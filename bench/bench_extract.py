@@ -0,0 +1,101 @@
+"""Benchmark job field extraction over a corpus of saved job pages.
+
+Compares the original seven `soup.select_one` calls on an html.parser tree
+with the compiled single-pass FieldExtractor on each available backend, and
+checks that every backend extracts exactly the same fields as the original
+code, whitespace included.
+
+    python bench/bench_extract.py [--corpus DIR] [--repeat N] [--json FILE]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from extractor import JOB_FIELD_SPECS, FieldExtractor  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'jobs')
+
+
+def select_one_extract(html):
+    """The original extraction: one select_one call per field"""
+    soup = BeautifulSoup(html, 'html.parser')
+    job_info = {}
+    for field, selector, default in JOB_FIELD_SPECS:
+        elem = soup.select_one(selector)
+        job_info[field] = elem.text.strip() if elem else default
+    return job_info
+
+
+def load_extractors():
+    extractors = {'select_one': select_one_extract}
+    for backend in ('html.parser', 'lxml'):
+        try:
+            extractors[f'single_pass[{backend}]'] = FieldExtractor(JOB_FIELD_SPECS, backend=backend).extract
+        except ImportError:
+            print(f"Skipping {backend} backend (not installed)", file=sys.stderr)
+    return extractors
+
+
+def measure(extract, pages, repeat):
+    """Return mean seconds per page and peak traced memory for one extractor"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            extract(html)
+    seconds_per_page = (time.perf_counter() - started) / (repeat * len(pages))
+
+    tracemalloc.start()
+    for html in pages:
+        extract(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'seconds_per_page': seconds_per_page, 'peak_bytes': peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='directory of saved job pages (*.html)')
+    parser.add_argument('--repeat', type=int, default=50, help='passes over the corpus per extractor')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.corpus, '*.html')))
+    if not paths:
+        parser.error(f"No *.html pages found in {args.corpus}")
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            pages.append(f.read())
+
+    extractors = load_extractors()
+    expected = [select_one_extract(html) for html in pages]
+
+    results = {}
+    for name, extract in extractors.items():
+        mismatches = [os.path.basename(path) for path, html, want in zip(paths, pages, expected)
+                      if extract(html) != want]
+        results[name] = {**measure(extract, pages, args.repeat), 'mismatches': mismatches}
+
+    baseline = results['select_one']['seconds_per_page']
+    print(f"{len(pages)} pages, {args.repeat} passes")
+    for name, result in results.items():
+        print(f"{name:28} {result['seconds_per_page'] * 1000:8.3f} ms/page  "
+              f"{baseline / result['seconds_per_page']:5.1f}x  "
+              f"peak {result['peak_bytes'] / 1024:8.1f} KiB  "
+              f"mismatches: {', '.join(result['mismatches']) or 'none'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'pages': len(pages), 'repeat': args.repeat, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
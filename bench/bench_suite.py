@@ -0,0 +1,311 @@
+"""Offline benchmark suite for scraping, search and the API.
+
+Runs against the local stand-ins in bench/stand_in.py instead of LinkedIn,
+Chrome and Ollama, so results are repeatable and need no network access:
+
+- parse: job page and search card extraction throughput over bench/fixtures
+- api: POST /api/scrape-job latency percentiles over real HTTP, cold and
+  cached, at each client concurrency level (concurrency scaling)
+- memory: traced allocations per scrape_job_info call
+- search: search crawl throughput at each number of page workers
+- store: GET /api/jobs query latency percentiles (full-text search, filters,
+  both combined, sorts) over a job store of --store-jobs synthetic jobs
+
+    python bench/bench_suite.py [--only parse,api,memory,search,store] [--jobs N]
+                                [--concurrency 1,2,4,8] [--page-latency S]
+                                [--llm-latency S] [--store-jobs N] [--json FILE]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from stand_in import FIXTURES, LinkedInStandIn, OllamaStub  # noqa: E402
+
+BENCHMARKS = ('parse', 'api', 'memory', 'search', 'store')
+
+# JobStore.query() keyword arguments per store benchmark case
+STORE_QUERIES = {
+    'page': {},
+    'deep_page': {'offset': 5000},
+    'status': {'status': 'interviewing'},
+    'skills_status': {'skills': ['Python', 'AWS'], 'status': 'applied'},
+    'sort_company': {'sort': 'company', 'status': 'applied'},
+    'text_rare': {'text': 'kubernetes django'},
+    'text_common': {'text': 'engineer'},
+    'text_prefix': {'text': 'engin'},
+    'text_status': {'text': 'engineer', 'status': 'rejected'},
+    'text_company': {'text': 'python', 'company': 'company 5'},
+    'text_work_mode_experience': {'text': 'engineer', 'work_mode': 'remote', 'experience_level': 'senior'},
+    'text_favorite': {'text': 'python', 'favorite': True},
+    'text_skill': {'text': 'engineer', 'skills': ['Java']},
+    'text_deep_page': {'text': 'engineer', 'work_mode': 'onsite', 'offset': 1000},
+    'relevance': {'text': 'python engineer', 'sort': 'relevance'},
+    'relevance_status': {'text': 'python engineer', 'sort': 'relevance', 'status': 'applied'},
+}
+
+
+def percentiles(samples):
+    """Return mean and p50/p90/p99 of a list of seconds, in milliseconds"""
+    if not samples:
+        return {}
+    samples = sorted(samples)
+
+    def at(p):
+        return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+    return {
+        'mean_ms': sum(samples) / len(samples) * 1000,
+        'p50_ms': at(0.5),
+        'p90_ms': at(0.9),
+        'p99_ms': at(0.99),
+        'max_ms': samples[-1] * 1000,
+    }
+
+
+def configure(args, linkedin, ollama, workdir):
+    """Point the tracker at the stand-ins and `workdir`; must run before it is imported"""
+    os.environ.update({
+        'LINKEDIN_GUEST_BASE_URL': linkedin.url,
+        'OLLAMA_HOST': ollama.url,
+        'FETCH_MODE': 'http',
+        'JOB_CACHE_PATH': os.path.join(workdir, 'job_cache.db'),
+        'JOB_STORE_PATH': os.path.join(workdir, 'jobs.db'),
+        'LLM_CONCURRENCY': str(args.llm_concurrency),
+        'SEARCH_WORKERS': str(max(args.concurrency)),
+        'HTTP_POOL_SIZE': str(max(args.concurrency) * 2),
+        # The stand-in does not throttle, so neither should the rate limiter
+        'RATE_LIMIT_PER_MINUTE': '1000000000',
+        'RATE_LIMIT_BURST': '1000000',
+        'REFRESH_INTERVAL': '0',
+    })
+
+
+def bench_parse(args):
+    from extractor import job_extractor
+    from search import parse_search_cards
+
+    job_pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, 'jobs', '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            job_pages.append(f.read())
+    with open(os.path.join(FIXTURES, 'search', 'guest_search_page.html'), encoding='utf-8') as f:
+        search_page = f.read()
+
+    results = {}
+    for name, parse, pages in (('job_page', job_extractor.extract, job_pages),
+                               ('search_page', parse_search_cards, [search_page])):
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for html in pages:
+                parse(html)
+        elapsed = time.perf_counter() - started
+        count = args.repeat * len(pages)
+        results[name] = {'pages': count, 'ms_per_page': elapsed / count * 1000, 'pages_per_second': count / elapsed}
+    results['search_page']['cards_per_page'] = len(parse_search_cards(search_page))
+    return results
+
+
+def job_url(job_id):
+    return f'https://www.linkedin.com/jobs/view/{job_id}/'
+
+
+def run_requests(base_url, job_ids, concurrency):
+    """POST one scrape per job ID with `concurrency` clients; returns (latencies, errors, seconds)"""
+    import requests
+
+    local = threading.local()
+    latencies = []
+    errors = []
+
+    def scrape(job_id):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        response = session.post(f'{base_url}/api/scrape-job', json={'url': job_url(job_id)})
+        elapsed = time.perf_counter() - started
+        if response.status_code == 200:
+            latencies.append(elapsed)
+        else:
+            errors.append(response.status_code)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(scrape, job_ids))
+    return latencies, errors, time.perf_counter() - started
+
+
+def bench_api(args):
+    from werkzeug.serving import make_server
+    from api import app
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    results = {}
+    next_id = 5000000000
+    try:
+        for concurrency in args.concurrency:
+            job_ids = [str(next_id + i) for i in range(args.jobs)]
+            next_id += args.jobs
+            level = {}
+            for phase in ('cold', 'cached'):
+                latencies, errors, elapsed = run_requests(base_url, job_ids, concurrency)
+                level[phase] = {
+                    'requests': len(job_ids),
+                    'errors': len(errors),
+                    'jobs_per_second': len(latencies) / elapsed,
+                    **percentiles(latencies),
+                }
+            results[f'concurrency_{concurrency}'] = level
+    finally:
+        server.shutdown()
+    return results
+
+
+def bench_memory(args):
+    import main
+
+    job_ids = [str(6000000000 + i) for i in range(args.jobs)]
+    main.scrape_job_info(job_url('5999999999'))  # imports and connections are not per-job cost
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    for job_id in job_ids:
+        main.scrape_job_info(job_url(job_id))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'jobs': len(job_ids),
+        'retained_bytes_per_job': (current - baseline) / len(job_ids),
+        'peak_traced_bytes': peak - baseline,
+        'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def bench_search(args):
+    import main
+    from search import SEARCH_PAGE_SIZE, iter_search_results, search_params
+
+    results = {}
+    for workers in args.concurrency:
+        params = search_params(f'bench {workers}', 'Berlin')
+        started = time.perf_counter()
+        count = sum(1 for _ in iter_search_results(params, main.fetch_search_page,
+                                                  max_pages=args.search_pages, workers=workers))
+        elapsed = time.perf_counter() - started
+        results[f'workers_{workers}'] = {
+            'pages': min(args.search_pages, -(-args.search_results // SEARCH_PAGE_SIZE)),
+            'jobs': count,
+            'seconds': elapsed,
+            'jobs_per_second': count / elapsed,
+        }
+    return results
+
+
+def synthetic_job(rng, job_id, words):
+    return {
+        'url': job_url(job_id),
+        'title': f"{rng.choice(['Senior', 'Junior', 'Staff'])} {rng.choice(['Python', 'Java', 'Data', 'Frontend'])} Engineer",
+        'company': f'Company {rng.randrange(2000)}',
+        'description': ' '.join(rng.choices(words, k=150)),
+        'skills': rng.sample(['Python', 'Java', 'SQL', 'React', 'Kubernetes', 'Go', 'Docker', 'AWS'], 3),
+        'status': rng.choice(['applied', 'responded', 'interviewing', 'accepted', 'rejected']),
+        'workMode': rng.choice(['Remote', 'Hybrid', 'Onsite']),
+        'experienceLevel': rng.choice(['Entry', 'Mid', 'Senior']),
+        'favorite': rng.random() < 0.05,
+    }
+
+
+def bench_store(args):
+    from job_store import JobStore
+
+    store = JobStore(os.path.join(args.workdir, 'bench_jobs.db'))
+    rng = random.Random(1)
+    words = [f'word{i}' for i in range(5000)] + ['python', 'java', 'kubernetes', 'react', 'sql', 'django']
+    started = time.perf_counter()
+    for i in range(args.store_jobs):
+        store.upsert(synthetic_job(rng, str(7000000000 + i), words))
+    load_seconds = time.perf_counter() - started
+
+    results = {'jobs': args.store_jobs, 'load_seconds': load_seconds}
+    for name, query in STORE_QUERIES.items():
+        total, _ = store.query(**query)  # warm the page cache
+        latencies = []
+        for _ in range(args.store_repeat):
+            started = time.perf_counter()
+            store.query(**query)
+            latencies.append(time.perf_counter() - started)
+        results[name] = {'total': total, **percentiles(latencies)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help='comma-separated benchmarks to run')
+    parser.add_argument('--jobs', type=int, default=40, help='scrapes per API concurrency level and for memory')
+    parser.add_argument('--concurrency', default='1,2,4,8', help='client concurrency levels / search workers')
+    parser.add_argument('--repeat', type=int, default=200, help='passes over the parse fixtures')
+    parser.add_argument('--page-latency', type=float, default=0.05, help='stand-in seconds per LinkedIn page')
+    parser.add_argument('--llm-latency', type=float, default=0.2, help='stub seconds per Ollama generation')
+    parser.add_argument('--llm-concurrency', type=int, default=4, help='LLM_CONCURRENCY for the run')
+    parser.add_argument('--search-pages', type=int, default=10, help='result pages per search crawl')
+    parser.add_argument('--search-results', type=int, default=250, help='results the stand-in search has')
+    parser.add_argument('--store-jobs', type=int, default=20000, help='synthetic jobs in the store benchmark')
+    parser.add_argument('--store-repeat', type=int, default=20, help='runs of each store query')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(',')]
+    selected = [name for name in args.only.split(',') if name]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    linkedin = LinkedInStandIn(latency=args.page_latency, search_results=args.search_results).start()
+    ollama = OllamaStub(latency=args.llm_latency).start()
+    workdir = tempfile.TemporaryDirectory(prefix='tracker-bench-')
+    args.workdir = workdir.name
+    configure(args, linkedin, ollama, args.workdir)
+
+    runners = {'parse': bench_parse, 'api': bench_api, 'memory': bench_memory, 'search': bench_search,
+               'store': bench_store}
+    results = {}
+    try:
+        for name in selected:
+            started = time.perf_counter()
+            results[name] = runners[name](args)
+            print(f"{name}: done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    finally:
+        linkedin.stop()
+        ollama.stop()
+        workdir.cleanup()
+
+    report = {
+        'config': {key: value for key, value in vars(args).items() if key not in ('json', 'only', 'workdir')},
+        'stand_in_requests': {'linkedin': linkedin.requests, 'ollama': ollama.requests},
+        'results': results,
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
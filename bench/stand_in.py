@@ -0,0 +1,197 @@
+"""Local stand-ins for LinkedIn's guest endpoints and the Ollama API.
+
+LinkedInStandIn serves the recorded pages in bench/fixtures: job postings at
+/jobs-guest/jobs/api/jobPosting/<id> and search result cards at
+/jobs-guest/jobs/api/seeMoreJobPostings/search?start=N. Job IDs are rewritten
+so every request sees distinct jobs, and each job gets its own description so
+the analysis caches and duplicate detection do not short-circuit the LLM.
+OllamaStub answers /api/generate with a valid analysis after a fixed latency.
+
+    python bench/stand_in.py [--page-latency S] [--llm-latency S]
+
+starts both on free ports and prints the environment variables that point
+the tracker at them.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Job ID of the recorded guest job posting, and the first ID on the recorded search page
+RECORDED_JOB_ID = '3812345678'
+RECORDED_SEARCH_IDS = re.compile(r'40000000(\d\d)')
+
+_DESCRIPTION_END = '</div>\n            </section>'
+_WORDS = (
+    'python go java kotlin rust typescript react kubernetes docker terraform aws gcp azure kafka spark '
+    'airflow postgresql mysql redis elasticsearch graphql grpc microservices observability security '
+    'payments logistics healthcare fintech retail mobile platform data analytics pipelines latency '
+    'scalability reliability mentoring ownership startup enterprise customers product design testing'
+).split()
+
+_SKILLS = ('Python', 'Go', 'Java', 'Kubernetes', 'Docker', 'AWS', 'PostgreSQL', 'Kafka', 'Terraform',
+           'React', 'TypeScript', 'Spark', 'Airflow', 'Redis', 'GraphQL')
+
+
+def load_fixture(*parts):
+    with open(os.path.join(FIXTURES, *parts), encoding='utf-8') as f:
+        return f.read()
+
+
+def job_page(job_id, template):
+    """Return the recorded job posting rewritten for `job_id`, with a description of its own"""
+    rng = random.Random(int(job_id) if job_id.isdigit() else job_id)
+    extra = ' '.join(rng.choice(_WORDS) for _ in range(120))
+    html = template.replace(RECORDED_JOB_ID, job_id)
+    return html.replace(_DESCRIPTION_END, f'<p>{extra}</p>\n{_DESCRIPTION_END}', 1)
+
+
+def search_page(start, template):
+    """Return the recorded search page with job IDs shifted by the `start` offset"""
+    return RECORDED_SEARCH_IDS.sub(lambda m: str(4000000000 + start + int(m.group(1))), template)
+
+
+class _Server:
+    """A ThreadingHTTPServer on a free local port, served from a daemon thread"""
+
+    handler = None
+
+    def __init__(self, port=0):
+        self.requests = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(self.handler):
+            owner = server
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.httpd.server_address[1]}'
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _LinkedInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        owner = self.owner
+        owner.count()
+        time.sleep(owner.latency)
+        parsed = urlparse(self.path)
+        match = re.fullmatch(r'/jobs-guest/jobs/api/jobPosting/(\d+)', parsed.path)
+        if match:
+            body = job_page(match.group(1), owner.job_template)
+        elif parsed.path == '/jobs-guest/jobs/api/seeMoreJobPostings/search':
+            start = int(parse_qs(parsed.query).get('start', ['0'])[0])
+            # LinkedIn answers past the last result with an empty body
+            body = search_page(start, owner.search_template) if start < owner.search_results else ''
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class LinkedInStandIn(_Server):
+    """Serves recorded guest job and search pages after `latency` seconds"""
+
+    handler = _LinkedInHandler
+
+    def __init__(self, latency=0.0, search_results=250, port=0):
+        self.latency = latency
+        self.search_results = search_results
+        self.job_template = load_fixture('jobs', 'guest_job_posting.html')
+        self.search_template = load_fixture('search', 'guest_search_page.html')
+        super().__init__(port)
+
+
+class _OllamaHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        owner = self.owner
+        owner.count()
+        if self.path != '/api/generate':
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        time.sleep(owner.latency)
+
+        prompt = request.get('prompt', '')
+        rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).digest())
+        analysis = {
+            'Skills': rng.sample(_SKILLS, 5),
+            'Experience Level': rng.choice(('entry', 'mid', 'senior')),
+            'Responsibilities': ['Design and operate backend services', 'Review code and designs'],
+            'Salary Range': f'{rng.randrange(50, 90)},000 - {rng.randrange(90, 140)},000 EUR',
+            'Work Mode': rng.choice(('remote', 'hybrid', 'onsite')),
+        }
+        payload = json.dumps({
+            'model': request.get('model'),
+            'response': json.dumps(analysis),
+            'done': True,
+            'prompt_eval_count': len(prompt) // 4,
+            'eval_count': 80,
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class OllamaStub(_Server):
+    """Answers Ollama generate requests with a JSON analysis after `latency` seconds"""
+
+    handler = _OllamaHandler
+
+    def __init__(self, latency=0.0, port=0):
+        self.latency = latency
+        super().__init__(port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--page-latency', type=float, default=0.05, help='seconds per LinkedIn page')
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='seconds per generation')
+    args = parser.parse_args()
+
+    linkedin = LinkedInStandIn(latency=args.page_latency).start()
+    ollama = OllamaStub(latency=args.llm_latency).start()
+    print(f"LINKEDIN_GUEST_BASE_URL={linkedin.url}")
+    print(f"OLLAMA_HOST={ollama.url}")
+    print("FETCH_MODE=http")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
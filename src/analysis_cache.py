@@ -0,0 +1,157 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+
+from sqlite_local import ThreadConnections
+
+logger = logging.getLogger(__name__)
+
+# How many writes happen between checks of the on-disk size bound
+EVICTION_INTERVAL = 50
+
+# A hit only records its use once the recorded one is this many seconds old,
+# so most reads do not take the write lock shared by every worker
+LAST_USED_RESOLUTION = 3600
+
+
+def template_version(template):
+    """Return a short fingerprint of a prompt template"""
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
+
+
+def normalize_description(job_description):
+    """Collapse case and whitespace so reposted copies of a description match"""
+    return ' '.join(job_description.lower().split())
+
+
+def analysis_key(job_description, model, template):
+    """Return the cache key for analyzing a description with a model and prompt"""
+    payload = '\0'.join((model, template_version(template), normalize_description(job_description)))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """On-disk memo of AI analyses keyed by description content
+
+    Keys hash the normalized description together with the model name and a
+    fingerprint of the prompt template, so the same posting found under
+    another URL or job ID reuses its analysis, while changing the model or
+    the template misses. Entries for other template versions are dropped when
+    the cache opens, and the least recently used entries (to within
+    LAST_USED_RESOLUTION) are evicted once the stored analyses exceed
+    `max_bytes`.
+    """
+
+    def __init__(self, path, template, max_bytes=32 * 1024 * 1024):
+        self.path = path
+        self.version = template_version(template)
+        self.max_bytes = max_bytes
+
+        self._connections = ThreadConnections(path)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                key TEXT PRIMARY KEY,
+                template_version TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_used ON analysis_cache (last_used_at)')
+        stale = conn.execute('DELETE FROM analysis_cache WHERE template_version != ?', (self.version,)).rowcount
+        conn.commit()
+        if stale:
+            logger.info(f"Dropped {stale} cached analyses from older prompt templates")
+
+    def _connection(self):
+        """Return this thread's SQLite connection"""
+        return self._connections.get()
+
+    def get(self, key):
+        """Return the cached analysis for a key, or None"""
+        try:
+            conn = self._connection()
+            row = conn.execute('SELECT value, last_used_at FROM analysis_cache WHERE key = ?', (key,)).fetchone()
+            now = time.time()
+            if row is not None and now - row[1] > LAST_USED_RESOLUTION:
+                conn.execute('UPDATE analysis_cache SET last_used_at = ? WHERE key = ?', (now, key))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading analysis cache: {e}")
+            row = None
+
+        with self._lock:
+            self._stats['hits' if row is not None else 'misses'] += 1
+        return json.loads(zlib.decompress(row[0])) if row is not None else None
+
+    def put(self, key, analysis):
+        """Store an analysis, evicting old entries when over the size bound"""
+        blob = zlib.compress(json.dumps(analysis).encode('utf-8'))
+        try:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO analysis_cache (key, template_version, value, size, last_used_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, self.version, blob, len(blob), time.time())
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing analysis cache: {e}")
+            return
+
+        with self._lock:
+            self._stats['writes'] += 1
+            self._writes += 1
+            check = self._writes % EVICTION_INTERVAL == 0
+        if check:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        conn = self._connection()
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM analysis_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        excess = total - self.max_bytes
+        freed = 0
+        keys = []
+        for key, size in conn.execute('SELECT key, size FROM analysis_cache ORDER BY last_used_at'):
+            keys.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany('DELETE FROM analysis_cache WHERE key = ?', keys)
+        conn.commit()
+        evicted = len(keys)
+
+        with self._lock:
+            self._stats['evictions'] += evicted
+        return evicted
+
+    def metrics(self):
+        """Return hit/miss counters and the stored size"""
+        with self._lock:
+            stats = dict(self._stats)
+        try:
+            entries, size = self._connection().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis_cache'
+            ).fetchone()
+        except sqlite3.Error:
+            entries, size = None, None
+        lookups = stats['hits'] + stats['misses']
+        return {
+            **stats,
+            'entries': entries,
+            'bytes': size,
+            'hit_ratio': stats['hits'] / lookups if lookups else 0.0,
+        }
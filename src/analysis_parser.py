@@ -0,0 +1,145 @@
+import ast
+import json
+import re
+
+# JSON schema of the AI analysis, also sent to Ollama for constrained output
+ANALYSIS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'Skills': {'type': 'array', 'items': {'type': 'string'}},
+        'Experience Level': {'type': 'string'},
+        'Responsibilities': {'type': 'array', 'items': {'type': 'string'}},
+        'Salary Range': {'type': 'string'},
+        'Work Mode': {'type': 'string'},
+    },
+    'required': ['Skills', 'Experience Level', 'Responsibilities', 'Salary Range', 'Work Mode'],
+}
+
+LIST_FIELDS = ('Skills', 'Responsibilities')
+
+# Spellings models use for each key, compared case-insensitively without punctuation
+_KEY_ALIASES = {
+    'skills': 'Skills',
+    'requiredskills': 'Skills',
+    'experiencelevel': 'Experience Level',
+    'experience': 'Experience Level',
+    'seniority': 'Experience Level',
+    'responsibilities': 'Responsibilities',
+    'keyresponsibilities': 'Responsibilities',
+    'salaryrange': 'Salary Range',
+    'estimatedsalaryrange': 'Salary Range',
+    'salary': 'Salary Range',
+    'workmode': 'Work Mode',
+    'workplacetype': 'Work Mode',
+}
+
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+_SMART_QUOTES = str.maketrans({'“': '"', '”': '"', '‘': "'", '’': "'"})
+
+
+class AnalysisParseError(Exception):
+    """Raised when a model reply holds no usable analysis object"""
+
+    def __init__(self, message, text):
+        super().__init__(message)
+        self.text = text
+
+
+def _find_object(text):
+    """Return the first balanced {...} block in text, skipping brackets inside strings"""
+    start = text.find('{')
+    while start != -1:
+        closers = []
+        quote = None
+        escaped = False
+        for i in range(start, len(text)):
+            char = text[i]
+            if quote:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == quote:
+                    quote = None
+            elif char in '"\'':
+                quote = char
+            elif char in '{[':
+                closers.append('}' if char == '{' else ']')
+            elif char in '}]' and closers:
+                closers.pop()
+                if not closers:
+                    return text[start:i + 1]
+        # Unbalanced from here (e.g. a truncated reply); close what is still open
+        if closers and quote is None:
+            return text[start:].rstrip().rstrip(',') + ''.join(reversed(closers))
+        start = text.find('{', start + 1)
+    return None
+
+
+def _load_object(candidate):
+    """Decode a JSON-ish object, tolerating the mistakes models commonly make"""
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        pass
+
+    repaired = _TRAILING_COMMA.sub(r'\1', candidate.translate(_SMART_QUOTES))
+    try:
+        return json.loads(repaired)
+    except ValueError:
+        pass
+
+    # Python-style literals: single quotes, True/False/None
+    try:
+        return ast.literal_eval(repaired)
+    except (ValueError, SyntaxError):
+        return None
+
+
+def _as_list(value):
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    if isinstance(value, str):
+        return [item.strip() for item in re.split(r'[;,\n]', value) if item.strip()]
+    return [str(value)]
+
+
+def _as_text(value):
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value)
+    if value is None:
+        return 'Not specified'
+    return str(value).strip()
+
+
+def parse_analysis(text):
+    """Parse a model reply into the analysis fields in a single pass
+
+    Accepts replies wrapped in prose or code fences, trailing commas, smart
+    or single quotes and differently spelled keys. Raises AnalysisParseError
+    when no object with any analysis key can be recovered.
+    """
+    candidate = _find_object(text or '')
+    data = _load_object(candidate) if candidate else None
+    if not isinstance(data, dict):
+        raise AnalysisParseError("No JSON object found in AI analysis", text)
+
+    analysis = {}
+    for key, value in data.items():
+        field = _KEY_ALIASES.get(re.sub(r'[^a-z]', '', str(key).lower()))
+        if field and field not in analysis:
+            analysis[field] = _as_list(value) if field in LIST_FIELDS else _as_text(value)
+
+    if not analysis:
+        raise AnalysisParseError("AI analysis has none of the expected keys", text)
+    return analysis
+
+
+def repair_prompt(text):
+    """Return a prompt asking the model to rewrite a reply as valid JSON"""
+    return (
+        "Rewrite the following job analysis as a single valid JSON object with exactly "
+        "these keys: Skills (list of strings), Experience Level (string), Responsibilities "
+        "(list of strings), Salary Range (string), Work Mode (string). "
+        "Reply with the JSON object only.\n\n" + text
+    )
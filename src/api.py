@@ -1,14 +1,97 @@
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, g, stream_with_context
 import os
 import sys
-import csv
-import io
-from main import scrape_job_info, initialize_langchain
+import threading
+import json
+import math
+import time
+from main import (scrape_job_info, iter_search_jobs, get_driver_pool, get_job_store, get_analysis_cache,
+                  get_refresh_scheduler, get_duplicate_index, get_similarity_index, find_similar_jobs,
+                  compare_jobs, remove_tracked_job, component_metrics)
+from job_cache import normalize_job_id
+from export import iter_jobs_csv, iter_tracked_jobs_csv, iter_ndjson, iter_gzip, coalesce
+from job_store import ANALYSIS_FIELDS, PAGE_FIELDS, SORT_COLUMNS
+from refresh import REFRESH_INTERVAL
+from llm_engine import get_analysis_engine
+from rate_limiter import RATE_LIMIT_WAIT_SECONDS, RateLimitTimeout, get_rate_limiter
+from http_fetcher import RateLimitedError
+from driver_factory import get_driver_factory
+from metrics import (http_request_seconds, start_request_timing, request_timings, server_timing,
+                     component_lines, render)
+from search import SEARCH_MAX_PAGES
+import pipeline
+from pipeline import BATCH_MAX_URLS, submit_batch, get_batch, submit_task, get_task, get_scrape_pipeline
 
 app = Flask(__name__)
 
-# Initialize the LangChain model
-llm_chain = initialize_langchain()
+# Send a Server-Timing header with the stage durations of every response
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'false').lower() in ('1', 'true', 'yes')
+
+# Set once the first request has started the background refresh
+_background_started = False
+
+@app.before_request
+def start_timing():
+    """Collect the stage durations of this request"""
+    g.request_started = time.perf_counter()
+    start_request_timing()
+
+@app.before_request
+def start_background_tasks():
+    """Start the refresh scheduler in the process serving requests (api.py, flask run or gunicorn)"""
+    global _background_started
+    if not _background_started:
+        _background_started = True
+        # Re-scrape tracked jobs on a budget to pick up edits and closures
+        if REFRESH_INTERVAL > 0:
+            get_refresh_scheduler().start()
+
+@app.after_request
+def finish_timing(response):
+    """Record the request latency and optionally report its stages (not the streamed body)"""
+    elapsed = time.perf_counter() - g.request_started
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    http_request_seconds.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+    if SERVER_TIMING:
+        response.headers['Server-Timing'] = server_timing(request_timings() or {}, elapsed)
+    return response
+
+def is_linkedin_job_url(url):
+    """Check that a URL points at a LinkedIn job page"""
+    return isinstance(url, str) and url.startswith('https://www.linkedin.com/jobs/')
+
+def build_job_response(job_url, job_info):
+    """Format scraped job information as the JSON object the tracker expects"""
+    return {
+        'id': normalize_job_id(job_url),
+        'url': job_url,
+        **{key: job_info.get(field, default) for key, field, default in PAGE_FIELDS},
+        'closed': bool(job_info.get('Closed')),
+        'duplicateOf': job_info.get('Duplicate Of'),
+        'dateApplied': None,  # To be filled by the frontend
+        'status': 'applied',  # Default status
+        # AI-analyzed data
+        **{key: job_info.get(field, default) for key, field, default in ANALYSIS_FIELDS},
+        # Additional tracking fields
+        'favorite': False,
+        'reminder': False,
+        'notes': '',
+        'interviewDate': None
+    }
+
+def record_job(job_url, job_info):
+    """Build the job object for a scrape and save it in the job store"""
+    job = build_job_response(job_url, job_info)
+    try:
+        return get_job_store().upsert(job)
+    except Exception as e:
+        print(f"Error saving job: {str(e)}", file=sys.stderr)
+        return job
+
+def record_task_result(task):
+    """Save a finished async scrape in the job store, once per task"""
+    if not task.error:
+        task.formatted_result(record_job)
 
 @app.route('/api/scrape-job', methods=['POST'])
 def scrape_job():
@@ -18,8 +101,14 @@ def scrape_job():
     Request body:
     {
         "url": "https://www.linkedin.com/jobs/view/job-id",
-        "format": "json" or "csv" (optional, defaults to "json")
+        "format": "json" or "csv" (optional, defaults to "json"),
+        "async": true (optional, defaults to false)
     }
+    
+    In async mode the scrape is queued and 202 is returned with a task ID
+    right away. Poll GET /api/tasks/<task_id> or subscribe to
+    GET /api/tasks/<task_id>/events (server-sent events) for the result.
+    Requests for a job that is already being scraped share its task.
     """
     try:
         data = request.json
@@ -31,87 +120,414 @@ def scrape_job():
         output_format = data.get('format', 'json')
         
         # Validate URL
-        if not job_url.startswith('https://www.linkedin.com/jobs/'):
+        if not is_linkedin_job_url(job_url):
             return jsonify({'error': 'Invalid LinkedIn job URL'}), 400
             
-        # Scrape job information
+        # Queue the scrape and return immediately in async mode
+        if data.get('async'):
+            task, deduplicated = submit_task(job_url, use_langchain=True)
+            # A shared task already records its result once
+            if not deduplicated:
+                task.add_done_callback(record_task_result)
+            response = jsonify({
+                'taskId': task.id,
+                'status': task.status,
+                'deduplicated': deduplicated,
+                'statusUrl': f'/api/tasks/{task.id}',
+                'eventsUrl': f'/api/tasks/{task.id}/events'
+            })
+            response.headers['Location'] = f'/api/tasks/{task.id}'
+            return response, 202
+            
+        # Scrape job information and keep it in the job store
         job_info = scrape_job_info(job_url, use_langchain=True)
+        job = record_job(job_url, job_info)
         
         if output_format.lower() == 'csv':
-            # Create CSV in memory
-            csv_output = io.StringIO()
-            csv_writer = csv.writer(csv_output)
-            
-            # Write headers
-            headers = [
-                'Job Title', 'Company Name', 'Job Description', 'Location', 
-                'Date Posted', 'Job Type', 'Applicants', 'URL',
-                'Skills', 'Experience Level', 'Responsibilities', 
-                'Salary Range', 'Work Mode'
-            ]
-            csv_writer.writerow(headers)
-            
-            # Write data
-            skills = ';'.join(job_info.get('Skills', [])) if isinstance(job_info.get('Skills', []), list) else job_info.get('Skills', '')
-            responsibilities = ';'.join(job_info.get('Responsibilities', [])) if isinstance(job_info.get('Responsibilities', []), list) else job_info.get('Responsibilities', '')
-            
-            row = [
-                job_info.get('Job Title', ''),
-                job_info.get('Company Name', ''),
-                job_info.get('Job Description', ''),
-                job_info.get('Location', ''),
-                job_info.get('Date Posted', ''),
-                job_info.get('Job Type', ''),
-                job_info.get('Applicants', ''),
-                job_url,
-                skills,
-                job_info.get('Experience Level', ''),
-                responsibilities,
-                job_info.get('Salary Range', ''),
-                job_info.get('Work Mode', '')
-            ]
-            csv_writer.writerow(row)
+            # Single-row CSV using the shared job column mapping
+            csv_output = ''.join(iter_jobs_csv([{**job_info, 'URL': job_url}]))
             
             # Return CSV response
             return Response(
-                csv_output.getvalue(),
+                csv_output,
                 mimetype='text/csv',
-                headers={'Content-Disposition': f'attachment;filename=job-{hash(job_url)}.csv'}
+                headers={'Content-Disposition': f'attachment;filename=job-{normalize_job_id(job_url)}.csv'}
             )
         else:
-            # Format the JSON response
-            response = {
-                'id': str(hash(job_url)),
-                'url': job_url,
-                'title': job_info.get('Job Title', 'Unknown'),
-                'company': job_info.get('Company Name', 'Unknown'),
-                'dateApplied': None,  # To be filled by the frontend
-                'status': 'applied',  # Default status
-                'description': job_info.get('Job Description', ''),
-                'location': job_info.get('Location', 'Unknown'),
-                'jobType': job_info.get('Job Type', 'Unknown'),
-                'datePosted': job_info.get('Date Posted', 'Unknown'),
-                'applicants': job_info.get('Applicants', 'Unknown'),
-                # AI-analyzed data
-                'skills': job_info.get('Skills', []),
-                'experienceLevel': job_info.get('Experience Level', 'Unknown'),
-                'responsibilities': job_info.get('Responsibilities', []),
-                'salaryRange': job_info.get('Salary Range', 'Unknown'),
-                'workMode': job_info.get('Work Mode', 'Unknown'),
-                # Additional tracking fields
-                'favorite': False,
-                'reminder': False,
-                'notes': '',
-                'interviewDate': None
-            }
-            
-            return jsonify(response), 200
+            return jsonify(job), 200
         
+    except (RateLimitedError, RateLimitTimeout) as e:
+        # LinkedIn or the rate limiter asked us to slow down; worth retrying
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = str(math.ceil(e.retry_after or RATE_LIMIT_WAIT_SECONDS))
+        return response, 503
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/scrape-jobs', methods=['POST'])
+def scrape_jobs():
+    """
+    API endpoint to scrape a batch of LinkedIn job URLs in the background
+    
+    Request body:
+    {
+        "urls": ["https://www.linkedin.com/jobs/view/job-id", ...],
+        "analyze": true (optional, defaults to true)
+    }
+    
+    Returns 202 with a batch ID. Progress and results are available from
+    GET /api/scrape-jobs/<batch_id>, or streamed as newline-delimited JSON
+    from GET /api/scrape-jobs/<batch_id>/stream.
+    """
+    data = request.json
+    
+    if not data or not isinstance(data.get('urls'), list) or not data['urls']:
+        return jsonify({'error': 'A non-empty list of URLs is required'}), 400
+    if len(data['urls']) > BATCH_MAX_URLS:
+        return jsonify({'error': f'At most {BATCH_MAX_URLS} URLs can be scraped per batch'}), 400
+    
+    invalid = [url for url in data['urls'] if not is_linkedin_job_url(url)]
+    if invalid:
+        return jsonify({'error': 'Invalid LinkedIn job URL', 'invalid': invalid}), 400
+    
+    batch = submit_batch(data['urls'], use_langchain=data.get('analyze', True), format_result=record_job)
+    return jsonify({
+        'batchId': batch.id,
+        'total': len(batch.urls),
+        'statusUrl': f'/api/scrape-jobs/{batch.id}',
+        'streamUrl': f'/api/scrape-jobs/{batch.id}/stream'
+    }), 202
+
+@app.route('/api/scrape-jobs/<batch_id>', methods=['GET'])
+def scrape_jobs_status(batch_id):
+    """API endpoint to poll a batch; pass ?offset=N to skip results already seen"""
+    batch = get_batch(batch_id)
+    if batch is None:
+        return jsonify({'error': 'Unknown batch ID'}), 404
+    return jsonify(batch.snapshot(offset=request.args.get('offset', 0, type=int))), 200
+
+@app.route('/api/scrape-jobs/<batch_id>/stream', methods=['GET'])
+def scrape_jobs_stream(batch_id):
+    """API endpoint streaming batch results as newline-delimited JSON as they finish"""
+    batch = get_batch(batch_id)
+    if batch is None:
+        return jsonify({'error': 'Unknown batch ID'}), 404
+    
+    def generate():
+        for result in batch.iter_results():
+            yield json.dumps(result) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/tasks/<task_id>', methods=['GET'])
+def task_status(task_id):
+    """API endpoint to poll an async scrape task"""
+    task = get_task(task_id)
+    if task is None:
+        return jsonify({'error': 'Unknown task ID'}), 404
+    return jsonify(task.to_dict(format_result=build_job_response)), 200
+
+@app.route('/api/tasks/<task_id>/events', methods=['GET'])
+def task_events(task_id):
+    """API endpoint sending an async scrape's completion as server-sent events"""
+    task = get_task(task_id)
+    if task is None:
+        return jsonify({'error': 'Unknown task ID'}), 404
+    
+    def generate():
+        yield f"event: status\ndata: {json.dumps(task.to_dict(format_result=build_job_response))}\n\n"
+        # Comment lines keep proxies from closing the idle connection
+        while not task.wait(timeout=15):
+            yield ": keep-alive\n\n"
+        yield f"event: {task.status}\ndata: {json.dumps(task.to_dict(format_result=build_job_response))}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """
+    API endpoint streaming LinkedIn job search results as server-sent events
+    
+    Query parameters:
+        keywords: search keywords (required)
+        location: search location (optional)
+        jobType, experienceLevel: LinkedIn f_JT / f_E filter codes (optional)
+        maxPages: number of result pages to crawl (optional, defaults to 3)
+    
+    Each job card is sent as a "job" event as soon as its page is parsed,
+    followed by a "done" event with the number of jobs found, or by an
+    "error" event with the message and the count so far if a page fails.
+    """
+    keywords = request.args.get('keywords', '').strip()
+    if not keywords:
+        return jsonify({'error': 'keywords is required'}), 400
+    max_pages = request.args.get('maxPages', 3, type=int)
+    if not 1 <= max_pages <= SEARCH_MAX_PAGES:
+        return jsonify({'error': f'maxPages must be between 1 and {SEARCH_MAX_PAGES}'}), 400
+    
+    jobs = iter_search_jobs(
+        keywords,
+        request.args.get('location', ''),
+        job_type=request.args.get('jobType'),
+        experience_level=request.args.get('experienceLevel'),
+        max_pages=max_pages
+    )
+    
+    def generate():
+        count = 0
+        try:
+            for job in jobs:
+                count += 1
+                yield f"event: job\ndata: {json.dumps(job)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e), 'count': count})}\n\n"
+            return
+        yield f"event: done\ndata: {json.dumps({'count': count})}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """
+    API endpoint querying the tracked job store
+    
+    Query parameters (all optional):
+        q: full-text search over title, description and skills
+        status, company, workMode, experienceLevel: exact, case-insensitive filters
+        skill: required skill, may be repeated
+        favorite: "true" or "false"
+        sort: "created" (default), "updated", "title", "company" or "relevance"
+        order: "desc" (default) or "asc"
+        page, pageSize: 1-based page number and page size (defaults 1 and 20, at most 100)
+    """
+    sort = request.args.get('sort', 'created')
+    if sort not in ('created', 'relevance', *SORT_COLUMNS):
+        return jsonify({'error': 'Unknown sort field'}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    page_size = min(max(request.args.get('pageSize', 20, type=int), 1), 100)
+    favorite = request.args.get('favorite')
+    
+    total, jobs = get_job_store().query(
+        text=request.args.get('q'),
+        status=request.args.get('status'),
+        company=request.args.get('company'),
+        work_mode=request.args.get('workMode'),
+        experience_level=request.args.get('experienceLevel'),
+        skills=request.args.getlist('skill'),
+        favorite=None if favorite is None else favorite.lower() in ('1', 'true'),
+        sort=sort,
+        descending=request.args.get('order', 'desc').lower() != 'asc',
+        limit=page_size,
+        offset=(page - 1) * page_size
+    )
+    return jsonify({'jobs': jobs, 'total': total, 'page': page, 'pageSize': page_size}), 200
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """API endpoint returning one tracked job"""
+    job = get_job_store().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    return jsonify(job), 200
+
+@app.route('/api/jobs/<job_id>', methods=['PATCH'])
+def update_job(job_id):
+    """API endpoint updating a tracked job's status, notes and other tracking fields"""
+    data = request.json
+    if not isinstance(data, dict) or not data:
+        return jsonify({'error': 'A JSON object of fields to update is required'}), 400
+    try:
+        job = get_job_store().update(job_id, data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if job is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    return jsonify(job), 200
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    """API endpoint removing a job from the tracked job store"""
+    if not remove_tracked_job(job_id):
+        return jsonify({'error': 'Unknown job ID'}), 404
+    return '', 204
+
+@app.route('/api/jobs/<job_id>/duplicates', methods=['GET'])
+def job_duplicates(job_id):
+    """API endpoint listing tracked jobs whose description nearly matches this job's, most similar first"""
+    index = get_duplicate_index()
+    signature = index.get(job_id)
+    if signature is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    threshold = request.args.get('threshold', index.threshold, type=float)
+    return jsonify([
+        {'id': duplicate_id, 'similarity': round(similarity, 3)}
+        for duplicate_id, similarity in index.query(signature, threshold=threshold, exclude=job_id)
+    ]), 200
+
+@app.route('/api/jobs/<job_id>/similar', methods=['GET'])
+def similar_jobs(job_id):
+    """
+    API endpoint returning the tracked jobs most similar to this one
+    
+    Query parameters (all optional):
+        k: number of jobs to return (defaults to 10, at most 100)
+        explain: number of the top jobs to also compare with the AI model (defaults to 0, at most 3)
+    
+    Jobs are scored on skills, experience level, work mode and salary range
+    against every tracked job at once; each result gets a 'similarity' score.
+    """
+    job = get_job_store().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    k = min(max(request.args.get('k', 10, type=int), 1), 100)
+    explain = min(max(request.args.get('explain', 0, type=int), 0), 3)
+    return jsonify(find_similar_jobs(job, k=k, explain=explain)), 200
+
+@app.route('/api/jobs/<job_id>/rank', methods=['GET'])
+def rank_jobs(job_id):
+    """API endpoint ranking every tracked job by similarity to this one, as [{id, similarity}]"""
+    job = get_job_store().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    return jsonify([
+        {'id': other_id, 'similarity': round(score, 3)}
+        for other_id, score in get_similarity_index().rank(job, exclude=job_id)
+    ]), 200
+
+@app.route('/api/compare', methods=['POST'])
+def compare():
+    """
+    API endpoint comparing two tracked jobs
+    
+    Request body:
+    {
+        "jobIds": ["first-job-id", "second-job-id"],
+        "explain": true (optional, defaults to true; false skips the AI comparison)
+    }
+    """
+    data = request.json
+    if not data or not isinstance(data.get('jobIds'), list) or len(data['jobIds']) != 2:
+        return jsonify({'error': 'Two job IDs are required'}), 400
+    
+    jobs = [get_job_store().get(job_id) for job_id in data['jobIds']]
+    if None in jobs:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    return jsonify(compare_jobs(jobs[0], jobs[1], explain=data.get('explain', True))), 200
+
+@app.route('/api/jobs/<job_id>/refresh', methods=['POST'])
+def refresh_job(job_id):
+    """API endpoint re-scraping a tracked job now and returning what changed"""
+    job = get_job_store().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    try:
+        changes = get_refresh_scheduler().refresh(job)
     except Exception as e:
         print(f"Error: {str(e)}", file=sys.stderr)
         return jsonify({'error': str(e)}), 500
+    return jsonify({
+        'job': get_job_store().get(job_id),
+        'changes': [{'field': field, 'old': old, 'new': new} for field, old, new in changes]
+    }), 200
+
+@app.route('/api/jobs/<job_id>/changes', methods=['GET'])
+def job_changes(job_id):
+    """API endpoint listing the changes detected on a tracked job, newest first"""
+    return jsonify(get_job_store().changes(job_id=job_id, limit=request.args.get('limit', 100, type=int))), 200
+
+@app.route('/api/changes', methods=['GET'])
+def all_changes():
+    """API endpoint listing changes across all tracked jobs; pass ?since=<unix time> to poll"""
+    return jsonify(get_job_store().changes(
+        since=request.args.get('since', type=float),
+        limit=request.args.get('limit', 100, type=int)
+    )), 200
+
+@app.route('/api/refresh', methods=['GET'])
+def refresh_metrics():
+    """API endpoint reporting refresh scheduler counters"""
+    return jsonify(get_refresh_scheduler().metrics()), 200
+
+@app.route('/api/export', methods=['GET'])
+def export_jobs():
+    """
+    API endpoint streaming every tracked job as CSV or newline-delimited JSON
+    
+    Query parameters:
+        format: "csv" or "ndjson" (optional, defaults to "csv")
+        gzip: "1" to gzip the download (optional)
+    
+    Rows are generated one at a time from the job store and sent with chunked
+    transfer encoding, so memory use does not grow with the number of jobs.
+    """
+    output_format = request.args.get('format', 'csv').lower()
+    if output_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'Format must be csv or ndjson'}), 400
+    
+    jobs = get_job_store().iter_jobs()
+    if output_format == 'csv':
+        chunks, mimetype = iter_tracked_jobs_csv(jobs), 'text/csv'
+    else:
+        chunks, mimetype = iter_ndjson(jobs), 'application/x-ndjson'
+    chunks = coalesce(chunks)
+    
+    filename = f'jobs.{output_format}'
+    if request.args.get('gzip') in ('1', 'true'):
+        chunks, mimetype, filename = iter_gzip(chunks), 'application/gzip', filename + '.gz'
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment;filename={filename}'}
+    )
+
+@app.route('/api/pipeline', methods=['GET'])
+def pipeline_metrics():
+    """API endpoint reporting queue depth and busy workers for each pipeline stage"""
+    return jsonify(get_scrape_pipeline().metrics()), 200
+
+@app.route('/api/llm', methods=['GET'])
+def llm_metrics():
+    """API endpoint reporting AI analysis call counts, token totals and latency"""
+    return jsonify({**get_analysis_engine().metrics(), 'cache': get_analysis_cache().metrics()}), 200
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus endpoint: stage and request histograms, error counters and component gauges"""
+    # Scraping must not create or start components; report only existing ones
+    components = component_metrics()
+    if pipeline._pipeline is not None:
+        components['pipeline'] = pipeline._pipeline.metrics()
+    lines = []
+    for name, stats in components.items():
+        lines.extend(component_lines(name, stats))
+    return Response(render(lines), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/rate-limits', methods=['GET'])
+def rate_limits():
+    """API endpoint reporting the rate, backoff and health of every host/proxy route"""
+    return jsonify(get_rate_limiter().metrics()), 200
+
+@app.route('/api/driver-pool', methods=['GET'])
+def driver_pool_metrics():
+    """API endpoint reporting WebDriver pool occupancy, recycling and startup counters"""
+    return jsonify({**get_driver_pool().metrics(), 'factory': get_driver_factory().metrics()}), 200
 
 if __name__ == '__main__':
+    # Start and log in the pooled browsers in the background (only in the
+    # reloader child, so the watcher process does not launch Chrome too)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        threading.Thread(target=get_driver_pool().warm, daemon=True).start()
+    
     # Get port from environment variable or use default
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=True) 
\ No newline at end of file
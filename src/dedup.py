@@ -0,0 +1,161 @@
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from analysis_cache import normalize_description
+from row_table import RowTable
+
+# Near-duplicate detection settings
+DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', '0.8'))
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16
+SHINGLE_SIZE = 3
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """Return the 64-bit hashes of every `size`-word shingle of a normalized text"""
+    tokens = normalize_description(text or '').split()
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64)
+    token_hashes = np.fromiter((zlib.crc32(token.encode('utf-8')) for token in tokens),
+                               dtype=np.uint64, count=len(tokens))
+    if len(tokens) < size:
+        size = len(tokens)
+
+    # Rolling combination of `size` consecutive token hashes, one row per shingle
+    count = len(tokens) - size + 1
+    hashes = token_hashes[:count].copy()
+    with np.errstate(over='ignore'):
+        for offset in range(1, size):
+            hashes = hashes * _MIX + token_hashes[offset:offset + count]
+    return np.unique(hashes)
+
+
+class NearDuplicateIndex:
+    """MinHash signatures with LSH banding for finding near-duplicate texts
+
+    Each text gets a `num_perm` value MinHash signature, split into `bands`
+    bands. Candidates are the stored texts sharing at least one band hash
+    with the query, found with one vectorized comparison over all stored
+    band hashes rather than by comparing pairs; they are then confirmed by
+    the fraction of signature values they share, an estimate of the
+    Jaccard similarity of the two shingle sets.
+    """
+
+    def __init__(self, num_perm=DEDUP_NUM_PERM, bands=DEDUP_BANDS, threshold=DEDUP_THRESHOLD, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+
+        # Multiply-shift hash family: h(x) = (a * x + b) >> 32 with odd a
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+        self._lock = threading.Lock()
+        self._digests = {}
+        self._table = RowTable({
+            'signatures': (np.uint32, 0, (num_perm,)),
+            'band_hashes': (np.uint64, 0, (bands,)),
+        })
+
+    def signature(self, text):
+        """Return the MinHash signature of a text"""
+        shingles = shingle_hashes(text)
+        if not len(shingles):
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        with np.errstate(over='ignore'):
+            values = (self._a[:, None] * shingles[None, :] + self._b[:, None]) >> np.uint64(32)
+        return values.min(axis=1).astype(np.uint32)
+
+    def _bands_of(self, signatures):
+        rows = signatures.reshape(len(signatures), self.bands, -1).astype(np.uint64)
+        hashes = rows[:, :, 0]
+        with np.errstate(over='ignore'):
+            for column in range(1, rows.shape[2]):
+                hashes = hashes * _MIX ^ rows[:, :, column]
+        return hashes
+
+    def add_many(self, keys, signatures, digests=None):
+        """Index many (key, signature) pairs at once, overwriting the rows of existing keys
+
+        `digests` optionally records what each signature was computed from
+        (e.g. a description hash), so `get(key, digest)` can skip recomputing it.
+        """
+        signatures = np.asarray(signatures, dtype=np.uint32).reshape(-1, self.num_perm)
+        band_hashes = self._bands_of(signatures)
+        with self._lock:
+            # The last signature of a key repeated in the batch wins
+            positions = {key: i for i, key in enumerate(keys)}
+            rows = self._table.assign(list(positions))
+            batch = np.fromiter(positions.values(), dtype=np.int64, count=len(positions))
+            self._table['signatures'][rows] = signatures[batch]
+            self._table['band_hashes'][rows] = band_hashes[batch]
+            for key, i in positions.items():
+                if digests is None:
+                    self._digests.pop(key, None)
+                else:
+                    self._digests[key] = digests[i]
+
+    def add(self, key, signature, digest=None):
+        """Index one signature under a key, replacing the key's previous one"""
+        self.add_many([key], [signature], None if digest is None else [digest])
+
+    def load(self, pairs):
+        """Index (key, signature bytes) pairs, as saved from `signature(text).tobytes()`"""
+        keys = []
+        blobs = []
+        for key, blob in pairs:
+            keys.append(key)
+            blobs.append(blob)
+        if keys:
+            self.add_many(keys, np.frombuffer(b''.join(blobs), dtype=np.uint32))
+
+    def get(self, key, digest=None):
+        """Return the indexed signature of a key, or None
+
+        With `digest`, only a signature recorded with that digest is returned.
+        """
+        with self._lock:
+            row = self._table.rows.get(key)
+            if row is None or (digest is not None and self._digests.get(key) != digest):
+                return None
+            return self._table['signatures'][row].copy()
+
+    def remove(self, key):
+        with self._lock:
+            self._digests.pop(key, None)
+            if self._table.remove(key) is not None and self._table.needs_compaction():
+                self._table.compact()
+
+    def query(self, signature, threshold=None, exclude=None):
+        """Return [(key, similarity)] of indexed texts at least `threshold` similar, best first"""
+        threshold = self.threshold if threshold is None else threshold
+        signature = np.asarray(signature, dtype=np.uint32)
+        query_bands = self._bands_of(signature[None, :])[0]
+        with self._lock:
+            table = self._table
+            size = table.size
+            candidates = np.flatnonzero(
+                table.live[:size] & (table['band_hashes'][:size] == query_bands).any(axis=1)
+            )
+            similarities = (table['signatures'][candidates] == signature).mean(axis=1)
+            keys = [table.keys[row] for row in candidates]
+
+        matches = [
+            (key, float(similarity))
+            for key, similarity in zip(keys, similarities)
+            if similarity >= threshold and key != exclude
+        ]
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+    def __len__(self):
+        with self._lock:
+            return len(self._table)
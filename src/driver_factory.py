@@ -0,0 +1,395 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+from metrics import stage
+
+try:
+    import fcntl
+except ImportError:  # Windows: profiles are only locked against this process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Persistent Chrome profiles, one directory per browser identity. An empty
+# value gives every browser a throwaway profile that logs in from scratch.
+CHROME_PROFILE_DIR = os.getenv('CHROME_PROFILE_DIR', 'chrome_profiles')
+# Identities shared by the browsers of every process using the directory
+CHROME_PROFILES = int(os.getenv('CHROME_PROFILES', '8'))
+
+# When driver.get() returns: 'normal' waits for every subresource, 'eager'
+# for the parsed document and 'none' not at all. Scrapes wait explicitly for
+# the elements they need instead.
+DRIVER_PAGE_LOAD_STRATEGY = os.getenv('DRIVER_PAGE_LOAD_STRATEGY', 'eager').lower()
+
+# Skip downloading images, media, fonts and trackers the scraper never reads
+DRIVER_BLOCK_RESOURCES = os.getenv('DRIVER_BLOCK_RESOURCES', 'true').lower() in ('1', 'true', 'yes')
+BLOCKED_URL_PATTERNS = (
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm', '*.mp3', '*.m3u8',
+    '*media.licdn.com/dms/image*', '*media.licdn.com/media*',
+    '*px.ads.linkedin.com*', '*linkedin.com/li/track*', '*linkedin.com/px/*', '*snap.licdn.com*',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*bat.bing.com*',
+    '*connect.facebook.net*',
+)
+
+# LinkedIn's session cookie; a saved one that is still valid skips the login
+SESSION_COOKIE = 'li_at'
+SESSION_COOKIE_DOMAIN = 'linkedin.com'
+# Saved sessions expiring within this many seconds are not reused
+SESSION_EXPIRY_MARGIN = 3600
+
+# Used when fake_useragent is not installed or cannot load its data
+FALLBACK_USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/119.0.0.0 Safari/537.36',
+)
+
+# Cookie fields Network.setCookies accepts back from Network.getAllCookies
+_COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+
+class UserAgentPool:
+    """Browser user agents, loaded from fake_useragent's data once per process"""
+
+    def __init__(self):
+        self.load_seconds = None
+        self._user_agent = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        started = time.monotonic()
+        try:
+            from fake_useragent import UserAgent
+            self._user_agent = UserAgent()
+        except Exception as e:
+            logger.warning(f"Could not load user agents, using built-in ones: {e}")
+        self.load_seconds = time.monotonic() - started
+
+    def random(self):
+        """Return a random user agent"""
+        with self._lock:
+            if self.load_seconds is None:
+                self._load()
+        if self._user_agent is not None:
+            try:
+                return self._user_agent.random
+            except Exception as e:
+                logger.warning(f"Error picking a user agent: {e}")
+        return random.choice(FALLBACK_USER_AGENTS)
+
+
+def session_valid(cookies, now=None):
+    """Return whether saved cookies hold a LinkedIn session that has not expired"""
+    now = time.time() if now is None else now
+    for cookie in cookies:
+        if cookie.get('name') == SESSION_COOKIE:
+            expires = cookie.get('expires', -1)
+            # Cookies without an expiry last as long as the profile does
+            return expires is None or expires < 0 or expires > now + SESSION_EXPIRY_MARGIN
+    return False
+
+
+class BrowserIdentity:
+    """A persistent Chrome profile with a fixed user agent and its saved LinkedIn session"""
+
+    def __init__(self, name, path, lock_file=None):
+        self.name = name
+        self.path = path
+        self.user_data_dir = os.path.abspath(os.path.join(path, 'user-data'))
+        self.lock_file = lock_file
+        self._identity_path = os.path.join(path, 'identity.json')
+        self._session_path = os.path.join(path, 'session.json')
+
+    def _read(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {path}: {e}")
+            return None
+
+    def _write(self, path, data):
+        # Session cookies are credentials: write privately and atomically
+        tmp_path = f'{path}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def user_agent(self, user_agents):
+        """Return this identity's user agent, picking one from the pool on first use"""
+        saved = self._read(self._identity_path) or {}
+        if saved.get('user_agent'):
+            return saved['user_agent']
+        user_agent = user_agents.random()
+        self._write(self._identity_path, {'user_agent': user_agent})
+        return user_agent
+
+    def load_session(self):
+        """Return the saved session cookies, or None"""
+        saved = self._read(self._session_path)
+        return saved.get('cookies') if saved else None
+
+    def save_session(self, cookies):
+        self._write(self._session_path, {'saved_at': time.time(), 'cookies': cookies})
+
+    def has_session(self):
+        return os.path.exists(self._session_path)
+
+    def forget_session(self):
+        try:
+            os.remove(self._session_path)
+        except FileNotFoundError:
+            pass
+
+
+class DriverFactory:
+    """Starts Chrome WebDrivers on persistent per-identity profiles
+
+    Each browser takes a free identity under `profile_dir`: a Chrome profile,
+    a user agent fixed at the identity's first launch, and the LinkedIn
+    session cookies saved at its last login or shutdown. The cookies are
+    restored into the new browser, so while the session has not expired
+    `login()` skips the login form. Chrome cannot share a profile between
+    processes, so identities are locked while in use; once all are taken,
+    browsers start on a throwaway profile and log in as before.
+
+    Browsers return from driver.get() as set by `page_load_strategy` and
+    never request URLs matching `blocked_urls` (wildcard patterns).
+    """
+
+    def __init__(self, profile_dir=CHROME_PROFILE_DIR, max_profiles=CHROME_PROFILES, user_agents=None,
+                 page_load_strategy=DRIVER_PAGE_LOAD_STRATEGY,
+                 blocked_urls=BLOCKED_URL_PATTERNS if DRIVER_BLOCK_RESOURCES else ()):
+        self.profile_dir = profile_dir
+        self.max_profiles = max_profiles
+        self.page_load_strategy = page_load_strategy
+        self.blocked_urls = list(blocked_urls)
+        self.user_agents = user_agents or UserAgentPool()
+        self._in_use = set()
+        self._lock = threading.Lock()
+        self._stats = {
+            'launches': 0,
+            'launch_failures': 0,
+            'launch_seconds_total': 0.0,
+            'throwaway_profiles': 0,
+            'logins': 0,
+            'logins_skipped': 0,
+            'sessions_restored': 0,
+            'sessions_expired': 0,
+            'sessions_forgotten': 0,
+        }
+
+    def _acquire_identity(self):
+        """Lock and return a free identity, or None when every one is taken"""
+        if not self.profile_dir:
+            return None
+        for i in range(self.max_profiles):
+            name = f'profile-{i}'
+            with self._lock:
+                if name in self._in_use:
+                    continue
+                self._in_use.add(name)
+            path = os.path.join(self.profile_dir, name)
+            lock_file = None
+            try:
+                os.makedirs(path, exist_ok=True)
+                if fcntl is not None:
+                    lock_file = open(os.path.join(path, '.lock'), 'w')
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return BrowserIdentity(name, path, lock_file)
+            except OSError:
+                # Used by another process
+                if lock_file is not None:
+                    lock_file.close()
+                with self._lock:
+                    self._in_use.discard(name)
+        return None
+
+    def _release_identity(self, identity):
+        if identity.lock_file is not None:
+            identity.lock_file.close()
+        with self._lock:
+            self._in_use.discard(identity.name)
+
+    def _options(self, headless, proxy, user_agent, identity):
+        from selenium.webdriver.chrome.options import Options
+
+        options = Options()
+        options.page_load_strategy = self.page_load_strategy
+        if headless:
+            options.add_argument('--headless')
+        options.add_argument(f'--user-agent={user_agent}')
+        if proxy:
+            options.add_argument(f'--proxy-server={proxy}')
+        if identity is not None:
+            options.add_argument(f'--user-data-dir={identity.user_data_dir}')
+
+        # Add additional options to avoid detection
+        options.add_argument('--disable-blink-features=AutomationControlled')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_experimental_option('excludeSwitches', ['enable-automation'])
+        options.add_experimental_option('useAutomationExtension', False)
+        return options
+
+    def create(self, headless=True, proxy=None):
+        """Start a browser on a free identity and restore its saved session if still valid"""
+        from selenium import webdriver
+
+        identity = self._acquire_identity()
+        started = time.monotonic()
+        try:
+            user_agent = identity.user_agent(self.user_agents) if identity else self.user_agents.random()
+            options = self._options(headless, proxy, user_agent, identity)
+            with stage('driver_startup'):
+                driver = webdriver.Chrome(options=options)
+                try:
+                    # Execute CDP commands to avoid detection
+                    driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": user_agent})
+                    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                        'source': '''
+                            Object.defineProperty(navigator, 'webdriver', {
+                                get: () => undefined
+                            })
+                        '''
+                    })
+                    if self.blocked_urls:
+                        driver.execute_cdp_cmd('Network.enable', {})
+                        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+                except Exception:
+                    driver.quit()
+                    raise
+        except Exception:
+            with self._lock:
+                self._stats['launch_failures'] += 1
+            if identity is not None:
+                self._release_identity(identity)
+            raise
+
+        driver.identity = identity
+        driver.route_proxy = proxy
+        driver.session_restored = identity is not None and self._restore_session(driver, identity)
+        with self._lock:
+            self._stats['launches'] += 1
+            self._stats['launch_seconds_total'] += time.monotonic() - started
+            if identity is None:
+                self._stats['throwaway_profiles'] += 1
+        return driver
+
+    def _restore_session(self, driver, identity):
+        cookies = identity.load_session()
+        if not cookies:
+            return False
+        if not session_valid(cookies):
+            logger.info(f"Saved LinkedIn session of {identity.name} has expired")
+            identity.forget_session()
+            with self._lock:
+                self._stats['sessions_expired'] += 1
+            return False
+        try:
+            params = [{key: cookie[key] for key in _COOKIE_FIELDS if key in cookie} for cookie in cookies]
+            for param in params:
+                if param.get('expires', 0) < 0:
+                    del param['expires']
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': params})
+        except Exception as e:
+            logger.warning(f"Could not restore the LinkedIn session of {identity.name}: {e}")
+            return False
+        with self._lock:
+            self._stats['sessions_restored'] += 1
+        return True
+
+    def login(self, driver, login):
+        """Log a new browser in with `login(driver)` unless it restored a valid session"""
+        if getattr(driver, 'session_restored', False):
+            logger.info(f"Reusing the saved LinkedIn session of {driver.identity.name}")
+            with self._lock:
+                self._stats['logins_skipped'] += 1
+            return True
+        logged_in = bool(login(driver))
+        if logged_in:
+            with self._lock:
+                self._stats['logins'] += 1
+            self.save_session(driver)
+        return logged_in
+
+    def save_session(self, driver):
+        """Save a browser's LinkedIn cookies to its identity"""
+        identity = getattr(driver, 'identity', None)
+        if identity is None:
+            return
+        try:
+            cookies = driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+            cookies = [cookie for cookie in cookies if cookie.get('domain', '').endswith(SESSION_COOKIE_DOMAIN)]
+            if session_valid(cookies):
+                identity.save_session(cookies)
+        except Exception as e:
+            logger.warning(f"Could not save the LinkedIn session of {identity.name}: {e}")
+
+    def forget_session(self, driver):
+        """Drop the saved session of a browser LinkedIn has logged out"""
+        identity = getattr(driver, 'identity', None)
+        driver.session_restored = False
+        if identity is None or not identity.has_session():
+            return
+        identity.forget_session()
+        try:
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        except Exception:
+            pass
+        with self._lock:
+            self._stats['sessions_forgotten'] += 1
+
+    def quit(self, driver):
+        """Save the session of a logged-in browser, quit it and free its identity"""
+        identity = getattr(driver, 'identity', None)
+        try:
+            if identity is not None and identity.has_session():
+                # LinkedIn rotates its cookies; keep the newest ones
+                self.save_session(driver)
+            driver.quit()
+        finally:
+            if identity is not None:
+                self._release_identity(identity)
+
+    def metrics(self):
+        """Return launch, profile and session reuse counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            in_use = len(self._in_use)
+        logins = stats['logins'] + stats['logins_skipped']
+        return {
+            'profile_dir': self.profile_dir,
+            'page_load_strategy': self.page_load_strategy,
+            'blocked_url_patterns': len(self.blocked_urls),
+            'profiles_in_use': in_use,
+            **stats,
+            'avg_launch_seconds': stats['launch_seconds_total'] / (stats['launches'] or 1),
+            'user_agent_load_seconds': self.user_agents.load_seconds,
+            'login_skip_rate': stats['logins_skipped'] / logins if logins else 0.0,
+        }
+
+
+_factory = None
+_factory_lock = threading.Lock()
+
+
+def get_driver_factory():
+    """Return the shared driver factory, creating it on first use"""
+    global _factory
+    with _factory_lock:
+        if _factory is None:
+            _factory = DriverFactory()
+        return _factory
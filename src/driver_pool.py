@@ -0,0 +1,237 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import record_stage
+
+logger = logging.getLogger(__name__)
+
+
+class PooledDriver:
+    """A WebDriver owned by the pool together with its usage bookkeeping"""
+
+    def __init__(self, driver, logged_in=False):
+        self.driver = driver
+        self.logged_in = logged_in
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+
+class DriverPool:
+    """Bounded pool of reusable, pre-authenticated Selenium WebDrivers
+
+    At most `size` browsers are alive at any time. Each one is logged in once
+    when it is created and handed out again and again until it has served
+    `max_uses` scrapes, is older than `max_age` seconds, fails a health check
+    or its LinkedIn session expires, at which point it is quit and replaced
+    on the next checkout. Browsers are shut down with `dispose(driver)`, by
+    default `driver.quit()`.
+    """
+
+    def __init__(self, factory, login=None, session_check=None, dispose=None, size=2,
+                 max_uses=50, max_age=3600, acquire_timeout=120):
+        self._factory = factory
+        self._login = login
+        self._session_check = session_check
+        self._dispose = dispose
+        self.size = size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = []
+        self._live = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._stats = {
+            'created': 0,
+            'recycled': 0,
+            'checkouts': 0,
+            'health_check_failures': 0,
+            'login_failures': 0,
+            'session_expirations': 0,
+            'startup_seconds_total': 0.0,
+            'wait_seconds_total': 0.0,
+        }
+
+    def _create(self):
+        """Start a new browser and log it in"""
+        started = time.monotonic()
+        driver = self._factory()
+        logged_in = False
+        if self._login:
+            try:
+                logged_in = bool(self._login(driver))
+            except Exception as e:
+                logger.error(f"Error logging in pooled WebDriver: {e}")
+        elapsed = time.monotonic() - started
+
+        with self._lock:
+            self._live += 1
+            self._stats['created'] += 1
+            self._stats['startup_seconds_total'] += elapsed
+            if self._login and not logged_in:
+                self._stats['login_failures'] += 1
+
+        logger.info(f"Started pooled WebDriver in {elapsed:.1f}s (logged in: {logged_in})")
+        return PooledDriver(driver, logged_in)
+
+    def _retire(self, pooled, reason):
+        """Quit a browser that should not be handed out again"""
+        logger.info(f"Recycling WebDriver after {pooled.uses} uses ({reason})")
+        with self._lock:
+            self._live -= 1
+            self._stats['recycled'] += 1
+        try:
+            if self._dispose:
+                self._dispose(pooled.driver)
+            else:
+                pooled.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting WebDriver: {e}")
+
+    def _expired(self, pooled):
+        """Return the reason a driver is due for recycling, or None"""
+        if self.max_uses and pooled.uses >= self.max_uses:
+            return 'max uses reached'
+        if self.max_age and time.monotonic() - pooled.created_at >= self.max_age:
+            return 'max age reached'
+        return None
+
+    def _healthy(self, pooled):
+        """Check that the browser behind a driver still responds"""
+        try:
+            pooled.driver.execute_script('return 1')
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled WebDriver failed health check: {e}")
+            with self._lock:
+                self._stats['health_check_failures'] += 1
+            return False
+
+    def _session_valid(self, pooled):
+        """Check that a logged-in driver has not been bounced to a login wall"""
+        if not (pooled.logged_in and self._session_check):
+            return True
+        try:
+            valid = self._session_check(pooled.driver)
+        except Exception:
+            valid = False
+        if not valid:
+            with self._lock:
+                self._stats['session_expirations'] += 1
+        return valid
+
+    def _checkout(self, prefer=None):
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError(f"No WebDriver available after {self.acquire_timeout}s")
+
+        try:
+            while True:
+                with self._lock:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    pooled = self._take_idle(prefer)
+
+                if pooled is None:
+                    pooled = self._create()
+                    break
+
+                reason = self._expired(pooled)
+                if reason is None and not self._healthy(pooled):
+                    reason = 'failed health check'
+                if reason is None:
+                    break
+                self._retire(pooled, reason)
+        except Exception:
+            self._slots.release()
+            raise
+
+        pooled.uses += 1
+        waited = time.monotonic() - started
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['wait_seconds_total'] += waited
+        record_stage('driver_checkout', waited)
+        return pooled
+
+    def _take_idle(self, prefer):
+        """Pop an idle driver, one matching `prefer(driver)` if any; the caller holds the lock"""
+        if not self._idle:
+            return None
+        if prefer is not None:
+            for i in range(len(self._idle) - 1, -1, -1):
+                if prefer(self._idle[i].driver):
+                    return self._idle.pop(i)
+        return self._idle.pop()
+
+    def _checkin(self, pooled):
+        try:
+            reason = self._expired(pooled)
+            if reason is None and not self._session_valid(pooled):
+                reason = 'session expired'
+
+            with self._lock:
+                if reason is None and not self._closed:
+                    self._idle.append(pooled)
+                    return
+            self._retire(pooled, reason or 'pool closed')
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self, prefer=None):
+        """Borrow a driver for the duration of a `with` block, an idle one matching `prefer(driver)` if any"""
+        pooled = self._checkout(prefer)
+        try:
+            yield pooled.driver
+        finally:
+            self._checkin(pooled)
+
+    def warm(self):
+        """Start and log in browsers until the pool is full"""
+        while True:
+            if not self._slots.acquire(blocking=False):
+                return
+            try:
+                with self._lock:
+                    if self._closed or self._live >= self.size:
+                        return
+                pooled = self._create()
+                with self._lock:
+                    self._idle.append(pooled)
+            except Exception as e:
+                logger.error(f"Error warming driver pool: {e}")
+                return
+            finally:
+                self._slots.release()
+
+    def close(self):
+        """Quit every idle browser; drivers in use are quit when returned"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._retire(pooled, 'pool closed')
+
+    def metrics(self):
+        """Return a snapshot of pool occupancy and lifetime counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            idle = len(self._idle)
+            live = self._live
+
+        created = stats['created'] or 1
+        checkouts = stats['checkouts'] or 1
+        return {
+            'size': self.size,
+            'live': live,
+            'idle': idle,
+            'in_use': live - idle,
+            **stats,
+            'avg_startup_seconds': stats['startup_seconds_total'] / created,
+            'avg_wait_seconds': stats['wait_seconds_total'] / checkouts,
+        }
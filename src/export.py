@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+import zlib
+
+# Column mapping for job CSV exports; list fields are joined with ';'
+JOB_CSV_HEADERS = [
+    'Job Title', 'Company Name', 'Job Description', 'Location',
+    'Date Posted', 'Job Type', 'Applicants', 'URL',
+    'Skills', 'Experience Level', 'Responsibilities',
+    'Salary Range', 'Work Mode'
+]
+
+# CSV columns for tracked jobs from the job store: (header, job object key)
+TRACKED_JOB_CSV_COLUMNS = (
+    ('Job Title', 'title'), ('Company Name', 'company'), ('Job Description', 'description'),
+    ('Location', 'location'), ('Date Posted', 'datePosted'), ('Job Type', 'jobType'),
+    ('Applicants', 'applicants'), ('URL', 'url'), ('Skills', 'skills'),
+    ('Experience Level', 'experienceLevel'), ('Responsibilities', 'responsibilities'),
+    ('Salary Range', 'salaryRange'), ('Work Mode', 'workMode'),
+    ('Status', 'status'), ('Date Applied', 'dateApplied'), ('Notes', 'notes'),
+)
+
+# Streamed output is sent in pieces of at least this many bytes
+CHUNK_SIZE = 16 * 1024
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    return ';'.join(value) if isinstance(value, list) else value
+
+
+def job_to_csv_row(job_info):
+    """Return the CSV row for a job, in JOB_CSV_HEADERS order"""
+    return [_csv_value(job_info.get(header, '')) for header in JOB_CSV_HEADERS]
+
+
+def tracked_job_to_csv_row(job):
+    """Return the CSV row for a stored job object, in TRACKED_JOB_CSV_COLUMNS order"""
+    return [_csv_value(job.get(key)) for _, key in TRACKED_JOB_CSV_COLUMNS]
+
+
+def iter_csv(rows, headers, to_row=None):
+    """Yield CSV text a line at a time, reusing one small buffer"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield line(headers)
+    for row in rows:
+        yield line(to_row(row) if to_row else row)
+
+
+def iter_jobs_csv(jobs):
+    """Yield jobs as CSV using the job column mapping"""
+    return iter_csv(jobs, JOB_CSV_HEADERS, job_to_csv_row)
+
+
+def iter_tracked_jobs_csv(jobs):
+    """Yield stored job objects as CSV, including their tracking fields"""
+    return iter_csv(jobs, [header for header, _ in TRACKED_JOB_CSV_COLUMNS], tracked_job_to_csv_row)
+
+
+def iter_ndjson(rows, to_dict=None):
+    """Yield one JSON document per line"""
+    for row in rows:
+        yield json.dumps(to_dict(row) if to_dict else row) + '\n'
+
+
+def coalesce(chunks, size=CHUNK_SIZE):
+    """Join small text chunks into pieces of about `size` bytes
+
+    The first chunk is passed through straight away so clients get the first
+    byte (e.g. the CSV header) without waiting for a full piece.
+    """
+    pending = []
+    pending_size = 0
+    first = True
+    for chunk in chunks:
+        if first:
+            first = False
+            yield chunk
+            continue
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= size:
+            yield ''.join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield ''.join(pending)
+
+
+def iter_gzip(chunks, level=6):
+    """Gzip a stream of text chunks incrementally
+
+    Each chunk is sync-flushed so it reaches the client as soon as it is
+    produced; pass coalesced chunks to keep the compression ratio up.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
@@ -0,0 +1,374 @@
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# 'auto' uses lxml when it is installed and BeautifulSoup's html.parser otherwise
+EXTRACTOR_BACKEND = os.getenv('EXTRACTOR_BACKEND', 'auto').lower()
+
+# Declarative table of job posting fields: (field, CSS selector group, default).
+# Like soup.select_one, the first element in document order matching any
+# selector in the group wins.
+JOB_FIELD_SPECS = (
+    ('Company Name',
+     '.topcard__org-name-link, .jobs-unified-top-card__company-name, '
+     '.jobs-unified-top-card__subtitle-primary-grouping a',
+     'Not specified'),
+    ('Job Title',
+     '.topcard__title, .jobs-unified-top-card__job-title, .jobs-unified-top-card__title',
+     'Not specified'),
+    ('Job Description',
+     '.description__text, .jobs-description-content, .jobs-description__content',
+     'Not available'),
+    ('Location',
+     '.topcard__flavor--bullet, .jobs-unified-top-card__workplace-type, '
+     '.jobs-unified-top-card__subtitle-primary-grouping .jobs-unified-top-card__bullet',
+     'Not specified'),
+    ('Date Posted',
+     '.posted-time-ago__text, .jobs-unified-top-card__posted-date, '
+     '.jobs-unified-top-card__subtitle-secondary-grouping .jobs-unified-top-card__posted-date',
+     'Not specified'),
+    ('Job Type',
+     '.topcard__flavor--bullet:nth-of-type(2), .jobs-unified-top-card__job-insight:nth-of-type(1), '
+     '.jobs-unified-top-card__subtitle-primary-grouping .jobs-unified-top-card__workplace-type',
+     'Not specified'),
+    ('Applicants',
+     '.num-applicants__caption, .jobs-unified-top-card__applicant-count, '
+     '.jobs-unified-top-card__subtitle-secondary-grouping .jobs-unified-top-card__applicant-count',
+     'Not specified'),
+    ('Closed',
+     '.closed-job__flavor--closed, .jobs-details-top-card__apply-error',
+     ''),
+)
+
+
+def field_selectors(fields, specs=JOB_FIELD_SPECS):
+    """Return the CSS selector group of each of `fields`, e.g. to wait for them in a browser"""
+    return [selector for field, selector, *_ in specs if field in fields]
+
+
+# Job cards on search result pages, both the logged-in list and the public
+# (guest) results
+SEARCH_CARD_SELECTOR = '.job-search-card, .base-search-card, .jobs-search-results__list-item'
+
+# Fields of a search card: (field, CSS selector group, default, attribute).
+# Fields with an attribute take its value instead of the element's text.
+SEARCH_CARD_SPECS = (
+    ('Job Title',
+     '.job-search-card__title, .base-search-card__title, .job-card-list__title',
+     'Not specified', None),
+    ('Company',
+     '.job-search-card__company-name, .base-search-card__subtitle, '
+     '.job-card-container__company-name, .artdeco-entity-lockup__subtitle',
+     'Not specified', None),
+    ('Location',
+     '.job-search-card__location, .job-card-container__metadata-item',
+     'Not specified', None),
+    ('Date Posted',
+     '.job-search-card__listdate, .job-search-card__listdate--new, .job-card-container__listed-time',
+     'Not specified', None),
+    ('URL',
+     'a.base-card__full-link, a.job-card-list__title, a.job-card-container__link',
+     None, 'href'),
+)
+
+_COMPOUND = re.compile(r'([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)(?::nth-of-type\((\d+)\))?')
+
+
+def compile_selector(selector):
+    """Compile a descendant-only CSS selector into a list of compound matchers
+
+    Each compound is (tag, classes, nth_of_type) and the list runs from the
+    element itself up towards its ancestors. Only tag names, classes,
+    :nth-of-type(n) and the descendant combinator are supported.
+    """
+    compounds = []
+    for part in selector.split():
+        match = _COMPOUND.fullmatch(part)
+        if not match or not any(match.groups()):
+            raise ValueError(f"Unsupported selector: {selector!r}")
+        tag, classes, nth = match.groups()
+        compounds.append((
+            tag.lower() if tag else None,
+            frozenset(classes.split('.')[1:]),
+            int(nth) if nth else None,
+        ))
+    compounds.reverse()
+    return compounds
+
+
+def _matches(compound, node):
+    tag, classes, nth = compound
+    return ((tag is None or node[0] == tag)
+            and classes.issubset(node[1])
+            and (nth is None or node[2] == nth))
+
+
+def _matches_chain(compounds, node):
+    """Match a compiled selector against a node and its ancestor chain"""
+    if not _matches(compounds[0], node):
+        return False
+    # With only descendant combinators, taking the nearest matching ancestor
+    # for each compound is always correct
+    ancestor = node[3]
+    for compound in compounds[1:]:
+        while ancestor is not None and not _matches(compound, ancestor):
+            ancestor = ancestor[3]
+        if ancestor is None:
+            return False
+        ancestor = ancestor[3]
+    return True
+
+
+# How BeautifulSoup's html.parser tree reads text, which the lxml backend
+# reproduces: strings of only ASCII whitespace (indentation between tags)
+# become a single newline or space outside these tags...
+_PRESERVE_WHITESPACE_TAGS = frozenset(('pre', 'textarea'))
+# ...and the text of these tags is not part of their parent's text
+_HIDDEN_TEXT_TAGS = frozenset(('script', 'style', 'template', 'rt', 'rp'))
+_ASCII_SPACES = ' \n\t\f\r'
+
+
+def _collapse(string, preserve):
+    if preserve or string.strip(_ASCII_SPACES):
+        return string
+    return '\n' if '\n' in string else ' '
+
+
+def _soup_text(element, parts, preserve=False):
+    preserve = preserve or element.tag in _PRESERVE_WHITESPACE_TAGS
+    if element.text:
+        parts.append(_collapse(element.text, preserve))
+    for child in element:
+        # Comments and processing instructions have a callable tag
+        if isinstance(child.tag, str) and child.tag not in _HIDDEN_TEXT_TAGS:
+            _soup_text(child, parts, preserve)
+        if child.tail:
+            parts.append(_collapse(child.tail, preserve))
+    return parts
+
+
+class _LxmlBackend:
+    name = 'lxml'
+
+    def __init__(self):
+        import lxml.html
+        self._parse = lxml.html.document_fromstring
+
+    def roots(self, html):
+        if not html or not html.strip():
+            return []
+        return [self._parse(html)]
+
+    @staticmethod
+    def children(element):
+        return element
+
+    @staticmethod
+    def tag(element):
+        # Comments and processing instructions have a callable tag
+        return element.tag if isinstance(element.tag, str) else None
+
+    @staticmethod
+    def classes(element):
+        return element.get('class', '').split()
+
+    @staticmethod
+    def text(element):
+        return ''.join(_soup_text(element, []))
+
+    @staticmethod
+    def attribute(element, name):
+        return element.get(name)
+
+
+class _SoupBackend:
+    name = 'html.parser'
+
+    def __init__(self):
+        from bs4 import BeautifulSoup, Tag
+        self._soup = BeautifulSoup
+        self._tag = Tag
+
+    def roots(self, html):
+        return self._soup(html, 'html.parser').contents
+
+    @staticmethod
+    def children(element):
+        return element.contents
+
+    def tag(self, element):
+        return element.name if isinstance(element, self._tag) else None
+
+    @staticmethod
+    def classes(element):
+        return element.get('class') or ()
+
+    @staticmethod
+    def text(element):
+        return element.text
+
+    @staticmethod
+    def attribute(element, name):
+        return element.get(name)
+
+
+def _load_backend(name):
+    if name in ('auto', 'lxml'):
+        try:
+            return _LxmlBackend()
+        except ImportError:
+            if name == 'lxml':
+                raise
+            logger.info("lxml is not installed, extracting with html.parser")
+    return _SoupBackend()
+
+
+def _index_selectors(selector_groups):
+    """Compile selector groups and index them by the class (or tag) they select
+
+    Returns (by_class, by_tag) mapping to lists of (group index, compounds).
+    """
+    by_class = {}
+    by_tag = {}
+    for index, selector_group in enumerate(selector_groups):
+        for selector in selector_group.split(','):
+            compounds = compile_selector(selector.strip())
+            tag, classes, _ = compounds[0]
+            if classes:
+                # Any one of the element's own classes is enough to index it
+                by_class.setdefault(min(classes), []).append((index, compounds))
+            else:
+                by_tag.setdefault(tag, []).append((index, compounds))
+    return by_class, by_tag
+
+
+def _candidates(by_class, by_tag, node):
+    """Return the indexed selectors that could match a node"""
+    candidates = by_tag.get(node[0], ())
+    for cls in node[1]:
+        if cls in by_class:
+            candidates = [*candidates, *by_class[cls]]
+    return candidates
+
+
+def _walk(backend, html):
+    """Yield (element, node, depth) for every element in document order
+
+    Each node is described by a (tag, classes, nth_of_type, parent) tuple so
+    selectors can be matched against the ancestor chain without going back
+    to the tree.
+    """
+    stack = [(iter(backend.roots(html)), None, {})]
+    while stack:
+        siblings, parent, type_counts = stack[-1]
+        element = next(siblings, None)
+        if element is None:
+            stack.pop()
+            continue
+
+        tag = backend.tag(element)
+        if tag is None:
+            continue
+        type_counts[tag] = nth = type_counts.get(tag, 0) + 1
+        node = (tag, backend.classes(element), nth, parent)
+        yield element, node, len(stack)
+
+        stack.append((iter(backend.children(element)), node, {}))
+
+
+class FieldExtractor:
+    """Extracts every field of a spec table from a page in a single tree walk
+
+    Selectors are compiled once and indexed by the class (or tag) of the
+    element they select, so each element in the page is only tested against
+    the few selectors that could possibly match it. The walk stops as soon as
+    every field has been found.
+    """
+
+    def __init__(self, specs, backend=EXTRACTOR_BACKEND):
+        self.specs = specs
+        self.backend = _load_backend(backend)
+        self._by_class, self._by_tag = _index_selectors(spec[1] for spec in specs)
+
+    def _find(self, html):
+        """Return the first matching element for every field index"""
+        by_class, by_tag = self._by_class, self._by_tag
+        found = {}
+        remaining = len(self.specs)
+
+        for element, node, _ in _walk(self.backend, html):
+            for index, compounds in _candidates(by_class, by_tag, node):
+                if index not in found and _matches_chain(compounds, node):
+                    found[index] = element
+                    remaining -= 1
+            if not remaining:
+                break
+        return found
+
+    def extract(self, html):
+        """Return a dict of stripped field texts, using each field's default when absent"""
+        found = self._find(html)
+        return {
+            field: self.backend.text(found[index]).strip() if index in found else default
+            for index, (field, _, default) in enumerate(self.specs)
+        }
+
+
+class CardExtractor:
+    """Extracts the fields of every repeated card on a page in a single tree walk
+
+    A card starts at each outermost element matching `card_selector`, and
+    every field takes the first element inside that card matching its
+    selectors. Specs are (field, selector group, default, attribute); fields
+    without an attribute take the element's stripped text.
+    """
+
+    def __init__(self, card_selector, specs, backend=EXTRACTOR_BACKEND):
+        self.specs = specs
+        self.backend = _load_backend(backend)
+        self._cards = [compile_selector(selector.strip()) for selector in card_selector.split(',')]
+        self._by_class, self._by_tag = _index_selectors(spec[1] for spec in specs)
+
+    def _find(self, html):
+        """Return one {field index: element} dict per card, in document order"""
+        by_class, by_tag = self._by_class, self._by_tag
+        cards = []
+        card = None
+        card_depth = 0
+
+        for element, node, depth in _walk(self.backend, html):
+            # Walking in document order, leaving the card's subtree means
+            # coming back up to its depth or above
+            if card is not None and depth <= card_depth:
+                card = None
+            if card is None:
+                if not any(_matches_chain(compounds, node) for compounds in self._cards):
+                    continue
+                card, card_depth = {}, depth
+                cards.append(card)
+
+            for index, compounds in _candidates(by_class, by_tag, node):
+                if index not in card and _matches_chain(compounds, node):
+                    card[index] = element
+        return cards
+
+    def _value(self, element, attribute):
+        if attribute:
+            return self.backend.attribute(element, attribute)
+        return self.backend.text(element).strip()
+
+    def extract_all(self, html):
+        """Return a list with a dict of field values for every card on the page"""
+        return [
+            {
+                field: self._value(card[index], attribute) if index in card else default
+                for index, (field, _, default, attribute) in enumerate(self.specs)
+            }
+            for card in self._find(html)
+        ]
+
+
+job_extractor = FieldExtractor(JOB_FIELD_SPECS)
+search_card_extractor = CardExtractor(SEARCH_CARD_SELECTOR, SEARCH_CARD_SPECS)
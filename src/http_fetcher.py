@@ -0,0 +1,114 @@
+import logging
+import os
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from job_cache import normalize_job_id
+from rate_limiter import RATE_LIMIT_WAIT_SECONDS, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# HTTP fetcher settings
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '10'))
+HTTP_USER_AGENT = os.getenv(
+    'HTTP_USER_AGENT',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+# Host serving the guest endpoints; the benchmarks point it at a local stand-in
+LINKEDIN_GUEST_BASE_URL = os.getenv('LINKEDIN_GUEST_BASE_URL', 'https://www.linkedin.com').rstrip('/')
+
+# Guest endpoint serving the public top card and description without JavaScript
+GUEST_JOB_URL = LINKEDIN_GUEST_BASE_URL + '/jobs-guest/jobs/api/jobPosting/{job_id}'
+
+# Guest endpoint serving one page of search result cards per `start=` offset
+GUEST_SEARCH_URL = LINKEDIN_GUEST_BASE_URL + '/jobs-guest/jobs/api/seeMoreJobPostings/search'
+
+_session = None
+_session_lock = threading.Lock()
+
+
+# Markers of a bot check served instead of the requested page
+CAPTCHA_MARKERS = ('captcha-internal', 'challenge-form', 'g-recaptcha', 'arkose')
+
+
+class AuthWallError(Exception):
+    """Raised when LinkedIn answers a public request with a login wall"""
+
+
+class RateLimitedError(Exception):
+    """Raised when LinkedIn throttles a request (HTTP 429/999 or a CAPTCHA); retry after `retry_after` seconds"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(response):
+    """Return a response's numeric Retry-After header in seconds, or None"""
+    value = response.headers.get('Retry-After', '')
+    return float(value) if value.isdigit() else None
+
+
+def get_http_session():
+    """Return the shared keep-alive session used for public LinkedIn pages"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                          allowed_methods=('GET',))
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE,
+                                  max_retries=retry)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update({
+                'User-Agent': HTTP_USER_AGENT,
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.9',
+            })
+            _session = session
+        return _session
+
+
+def public_job_url(url):
+    """Return the guest URL for a job posting, or the URL itself if it has no job ID"""
+    job_id = normalize_job_id(url)
+    if job_id.isdigit():
+        return GUEST_JOB_URL.format(job_id=job_id)
+    return url
+
+
+def _fetch_public(url, params=None):
+    # Sent over the healthiest proxy as soon as its rate allows
+    with get_rate_limiter().lease(urlparse(url).netloc, timeout=RATE_LIMIT_WAIT_SECONDS) as lease:
+        response = get_http_session().get(url, params=params, timeout=HTTP_TIMEOUT, proxies=lease.proxies)
+        if response.status_code in (429, 999):
+            retry_after = retry_after_seconds(response)
+            lease.throttled('rate_limited', retry_after)
+            raise RateLimitedError(f"HTTP {response.status_code} from {urlparse(url).netloc}", retry_after)
+        if any(marker in response.url for marker in ('/login', '/authwall', '/checkpoint')):
+            lease.throttled('auth_wall')
+            raise AuthWallError(f"Redirected to {response.url}")
+        if any(marker in response.text for marker in CAPTCHA_MARKERS):
+            lease.throttled('captcha')
+            raise RateLimitedError("CAPTCHA served instead of the page")
+    # Other HTTP errors are about the page, not the route
+    response.raise_for_status()
+    return response.text
+
+
+def fetch_public_job_html(url):
+    """Fetch the public (logged-out) HTML for a LinkedIn job posting"""
+    return _fetch_public(public_job_url(url))
+
+
+def fetch_public_search_html(params):
+    """Fetch one page of public (logged-out) search result cards"""
+    return _fetch_public(GUEST_SEARCH_URL, params)
@@ -0,0 +1,223 @@
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import urljoin, urlparse, parse_qs
+
+from sqlite_local import ThreadConnections
+
+logger = logging.getLogger(__name__)
+
+# Kinds of entries stored per job
+CACHE_KINDS = ('html', 'fields', 'analysis')
+
+# Longest time between purges of expired entries from disk, in seconds
+PURGE_INTERVAL = 3600
+
+JOB_VIEW_URL = 'https://www.linkedin.com/jobs/view/{job_id}/'
+
+_JOB_ID_PATTERNS = (
+    re.compile(r'/jobs/view/(?:[^/?#]*-)?(\d+)'),
+    re.compile(r'/jobs-guest/jobs/api/jobPosting/(\d+)'),
+)
+
+
+def normalize_job_id(url):
+    """Return the LinkedIn job ID for a job URL, ignoring tracking parameters
+
+    Falls back to the URL without its query string and fragment when no
+    numeric job ID can be found.
+    """
+    parsed = urlparse(url.strip())
+    current_job_id = parse_qs(parsed.query).get('currentJobId')
+    if current_job_id and current_job_id[0].isdigit():
+        return current_job_id[0]
+    for pattern in _JOB_ID_PATTERNS:
+        match = pattern.search(parsed.path)
+        if match:
+            return match.group(1)
+    return f"{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
+
+
+def canonical_job_url(url):
+    """Return the plain job view URL for a job link, dropping tracking parameters"""
+    url = urljoin('https://www.linkedin.com', url)
+    job_id = normalize_job_id(url)
+    return JOB_VIEW_URL.format(job_id=job_id) if job_id.isdigit() else url
+
+
+class JobCache:
+    """Two-tier job cache: a bounded in-memory LRU over a shared SQLite file
+
+    Entries are keyed by (kind, job ID) so raw HTML, parsed fields and the LLM
+    analysis expire and are invalidated independently. The SQLite file runs
+    in WAL mode so every worker process reads and writes the same store, and
+    entries survive restarts until their TTL runs out. A memory hit is checked
+    against the row's timestamp, so writes and invalidations by other workers
+    take effect at once. Expired entries are
+    deleted from disk by a write at most every `PURGE_INTERVAL` seconds (or
+    TTL, if shorter).
+    """
+
+    def __init__(self, path, ttl=86400, max_memory_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_memory_bytes = max_memory_bytes
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._connections = ThreadConnections(path)
+        self._next_purge = 0.0
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'purged': 0}
+
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                kind TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (kind, job_id)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_entries_created ON cache_entries (created_at)')
+        conn.commit()
+
+    def _connection(self):
+        """Return this thread's SQLite connection"""
+        return self._connections.get()
+
+    def _expired(self, created_at):
+        return self.ttl and time.time() - created_at > self.ttl
+
+    def _remember(self, key, value, created_at, size):
+        """Insert into the memory tier, evicting least recently used entries
+
+        `size` is the entry's uncompressed JSON size, as held in memory.
+        """
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous:
+                self._memory_bytes -= previous[2]
+            self._memory[key] = (value, created_at, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, (_, _, evicted_size) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_size
+                self._stats['evictions'] += 1
+
+    def _forget(self, key):
+        with self._lock:
+            entry = self._memory.pop(key, None)
+            if entry:
+                self._memory_bytes -= entry[2]
+
+    def get(self, kind, job_id):
+        """Return a cached value, or None if missing or expired"""
+        key = (kind, job_id)
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry and not self._expired(entry[1]):
+            # Other workers may have replaced or dropped the row since; the
+            # memory copy is only served while the row is the one it came from
+            try:
+                row = self._connection().execute(
+                    'SELECT created_at FROM cache_entries WHERE kind = ? AND job_id = ?',
+                    (kind, job_id)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"Error reading job cache: {e}")
+                row = (entry[1],)
+            if row is not None and row[0] == entry[1]:
+                with self._lock:
+                    if key in self._memory:
+                        self._memory.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                return entry[0]
+
+        try:
+            row = self._connection().execute(
+                'SELECT value, created_at FROM cache_entries WHERE kind = ? AND job_id = ?',
+                (kind, job_id)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading job cache: {e}")
+            row = None
+
+        if row is None or self._expired(row[1]):
+            self._forget(key)
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        data = zlib.decompress(row[0])
+        value = json.loads(data)
+        self._remember(key, value, row[1], len(data))
+        with self._lock:
+            self._stats['disk_hits'] += 1
+        return value
+
+    def put(self, kind, job_id, value):
+        """Store a JSON-serializable value for a job"""
+        if kind not in CACHE_KINDS:
+            raise ValueError(f"Unknown cache kind: {kind}")
+        data = json.dumps(value).encode('utf-8')
+        blob = zlib.compress(data)
+        created_at = time.time()
+        try:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries (kind, job_id, value, created_at) VALUES (?, ?, ?, ?)',
+                (kind, job_id, blob, created_at)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing job cache: {e}")
+        self._remember((kind, job_id), value, created_at, len(data))
+        with self._lock:
+            self._stats['writes'] += 1
+            purge = self.ttl and created_at >= self._next_purge
+            if purge:
+                self._next_purge = created_at + min(self.ttl, PURGE_INTERVAL)
+        if purge:
+            self.purge_expired()
+
+    def invalidate(self, job_id, kinds=CACHE_KINDS):
+        """Drop the given kinds of entries for a job"""
+        conn = self._connection()
+        for kind in kinds:
+            self._forget((kind, job_id))
+            conn.execute('DELETE FROM cache_entries WHERE kind = ? AND job_id = ?', (kind, job_id))
+        conn.commit()
+
+    def purge_expired(self):
+        """Delete expired entries from disk and return how many were removed"""
+        if not self.ttl:
+            return 0
+        try:
+            conn = self._connection()
+            cursor = conn.execute('DELETE FROM cache_entries WHERE created_at < ?', (time.time() - self.ttl,))
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error purging job cache: {e}")
+            return 0
+        with self._lock:
+            self._stats['purged'] += cursor.rowcount
+        return cursor.rowcount
+
+    def metrics(self):
+        """Return hit/miss counters and memory tier usage"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_bytes
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_ratio'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
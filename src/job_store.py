@@ -0,0 +1,526 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from analysis_cache import normalize_description
+from job_cache import normalize_job_id
+from sqlite_local import ThreadConnections
+
+logger = logging.getLogger(__name__)
+
+# SQLite page cache per connection, in KiB
+JOB_STORE_CACHE_KB = int(os.getenv('JOB_STORE_CACHE_KB', '65536'))
+# Relevance sorting ranks this many of the newest full-text matches; older
+# matches follow them newest first
+JOB_SEARCH_RANK_WINDOW = int(os.getenv('JOB_SEARCH_RANK_WINDOW', '1000'))
+
+# Job object keys filled from the scraped page and from the AI analysis:
+# (object key, job_info field, default)
+PAGE_FIELDS = (
+    ('title', 'Job Title', 'Unknown'),
+    ('company', 'Company Name', 'Unknown'),
+    ('description', 'Job Description', ''),
+    ('location', 'Location', 'Unknown'),
+    ('jobType', 'Job Type', 'Unknown'),
+    ('datePosted', 'Date Posted', 'Unknown'),
+    ('applicants', 'Applicants', 'Unknown'),
+)
+ANALYSIS_FIELDS = (
+    ('skills', 'Skills', []),
+    ('experienceLevel', 'Experience Level', 'Unknown'),
+    ('responsibilities', 'Responsibilities', []),
+    ('salaryRange', 'Salary Range', 'Unknown'),
+    ('workMode', 'Work Mode', 'Unknown'),
+)
+
+# Fields the tracker edits; a re-scrape of a stored job never overwrites them
+TRACKING_FIELDS = ('status', 'favorite', 'reminder', 'notes', 'dateApplied', 'interviewDate')
+
+# Job object values that mean the scraped page did not have the field
+MISSING_JOB_VALUES = (None, '', [], 'Unknown', 'Not specified', 'Not available')
+
+# Sort keys accepted by query() besides 'created' and 'relevance'. Rowids grow
+# with insertion, so 'created' order comes straight out of every index.
+SORT_COLUMNS = {
+    'updated': 'jobs.updated_at',
+    'title': 'jobs.title',
+    'company': 'jobs.company',
+}
+
+_FTS_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+# The jobs table only holds the narrow columns that are filtered and sorted
+# on; the full job object and the searchable text live in side tables keyed
+# by its rowid, so index lookups never touch large rows.
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT NOT NULL UNIQUE,
+        title TEXT COLLATE NOCASE,
+        company TEXT COLLATE NOCASE,
+        status TEXT COLLATE NOCASE,
+        work_mode TEXT COLLATE NOCASE,
+        experience_level TEXT COLLATE NOCASE,
+        favorite INTEGER NOT NULL DEFAULT 0,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs (updated_at);
+    CREATE INDEX IF NOT EXISTS idx_jobs_title ON jobs (title);
+    CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs (company);
+    CREATE INDEX IF NOT EXISTS idx_jobs_favorite ON jobs (favorite);
+    -- Each low-cardinality filter leads one index that also covers the others,
+    -- so any combination of them is counted without reading the table
+    CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, work_mode, experience_level, favorite);
+    CREATE INDEX IF NOT EXISTS idx_jobs_work_mode ON jobs (work_mode, experience_level, status, favorite);
+    CREATE INDEX IF NOT EXISTS idx_jobs_experience ON jobs (experience_level, status, work_mode, favorite);
+
+    CREATE TABLE IF NOT EXISTS job_data (
+        job_rowid INTEGER PRIMARY KEY,
+        data TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS job_skills (
+        skill TEXT NOT NULL COLLATE NOCASE,
+        job_rowid INTEGER NOT NULL,
+        PRIMARY KEY (skill, job_rowid)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_job_skills_job ON job_skills (job_rowid);
+
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(title, description, skills);
+
+    CREATE TABLE IF NOT EXISTS job_refresh (
+        job_rowid INTEGER PRIMARY KEY,
+        fingerprint TEXT,
+        description_hash TEXT,
+        refreshed_at REAL NOT NULL,
+        active INTEGER NOT NULL DEFAULT 1,
+        failures INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_job_refresh_due ON job_refresh (active, refreshed_at);
+
+    CREATE TABLE IF NOT EXISTS job_changes (
+        id INTEGER PRIMARY KEY,
+        job_id TEXT NOT NULL,
+        field TEXT NOT NULL,
+        old TEXT,
+        new TEXT,
+        changed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_job_changes_job ON job_changes (job_id, id);
+    CREATE INDEX IF NOT EXISTS idx_job_changes_time ON job_changes (changed_at);
+
+    -- MinHash signatures of scraped descriptions, for near-duplicate detection
+    CREATE TABLE IF NOT EXISTS job_signatures (
+        job_id TEXT PRIMARY KEY,
+        signature BLOB NOT NULL
+    ) WITHOUT ROWID;
+
+    -- Jobs stored before refresh tracking existed are due straight away
+    INSERT OR IGNORE INTO job_refresh (job_rowid, refreshed_at) SELECT rowid, 0 FROM jobs;
+'''
+
+
+def page_fingerprint(job):
+    """Return a hash of a job object's scraped page fields"""
+    payload = json.dumps([job.get(key) for key, _, _ in PAGE_FIELDS] + [bool(job.get('closed'))])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def description_hash(description):
+    """Return a hash of a description that ignores case and whitespace changes"""
+    return hashlib.sha256(normalize_description(description or '').encode('utf-8')).hexdigest()
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query matching every word, the last one as a prefix"""
+    tokens = _FTS_TOKEN.findall(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+class JobStore:
+    """Persistent store of tracked jobs with indexed filters and full-text search
+
+    Holds the job objects the API returns, keyed by LinkedIn job ID. The
+    columns the tracker filters and sorts on are indexed, skills get their own
+    lookup table, and title, description and skills are indexed with FTS5, so
+    queries stay fast with hundreds of thousands of jobs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connections = ThreadConnections(path, pragmas=[f'cache_size=-{JOB_STORE_CACHE_KB}'])
+        self._write_lock = threading.Lock()
+
+        conn = self._connection()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        # Refresh the planner's statistics so it picks the right index per filter
+        conn.execute('PRAGMA optimize')
+
+    def _connection(self):
+        """Return this thread's SQLite connection"""
+        return self._connections.get()
+
+    def _write(self, conn, job_id, job):
+        """Insert or update a job and its side table rows; the caller commits"""
+        skills = job.get('skills') or []
+        if isinstance(skills, str):
+            skills = [skills]
+        now = time.time()
+        conn.execute(
+            '''INSERT INTO jobs (id, title, company, status, work_mode, experience_level,
+                                 favorite, created_at, updated_at)
+               VALUES (:id, :title, :company, :status, :work_mode, :experience_level,
+                       :favorite, :now, :now)
+               ON CONFLICT (id) DO UPDATE SET
+                   title = excluded.title, company = excluded.company,
+                   status = excluded.status, work_mode = excluded.work_mode,
+                   experience_level = excluded.experience_level, favorite = excluded.favorite,
+                   updated_at = excluded.updated_at''',
+            {
+                'id': job_id,
+                'title': job.get('title'),
+                'company': job.get('company'),
+                'status': job.get('status'),
+                'work_mode': job.get('workMode'),
+                'experience_level': job.get('experienceLevel'),
+                'favorite': 1 if job.get('favorite') else 0,
+                'now': now,
+            }
+        )
+        rowid = conn.execute('SELECT rowid FROM jobs WHERE id = ?', (job_id,)).fetchone()[0]
+        conn.execute('INSERT OR REPLACE INTO job_data (job_rowid, data) VALUES (?, ?)', (rowid, json.dumps(job)))
+        conn.execute('DELETE FROM job_skills WHERE job_rowid = ?', (rowid,))
+        conn.executemany(
+            'INSERT OR IGNORE INTO job_skills (skill, job_rowid) VALUES (?, ?)',
+            [(skill.strip(), rowid) for skill in skills if skill.strip()]
+        )
+        conn.execute('DELETE FROM jobs_fts WHERE rowid = ?', (rowid,))
+        conn.execute(
+            'INSERT INTO jobs_fts (rowid, title, description, skills) VALUES (?, ?, ?, ?)',
+            (rowid, job.get('title'), job.get('description'), ' '.join(skills))
+        )
+        return rowid
+
+    @staticmethod
+    def _mark_refreshed(conn, rowid, job, state=None):
+        """Record the fingerprints of a freshly scraped job, or the given ones; the caller commits"""
+        fingerprint, digest = state or (page_fingerprint(job), description_hash(job.get('description')))
+        conn.execute(
+            '''INSERT OR REPLACE INTO job_refresh (job_rowid, fingerprint, description_hash, refreshed_at, active)
+               VALUES (?, ?, ?, ?, ?)''',
+            (rowid, fingerprint, digest, time.time(), 0 if job.get('closed') else 1)
+        )
+
+    def _load(self, conn, job_id):
+        row = conn.execute(
+            'SELECT job_data.data FROM jobs JOIN job_data ON job_data.job_rowid = jobs.rowid WHERE jobs.id = ?',
+            (job_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def upsert(self, job):
+        """Store a scraped job object and return it as stored
+
+        The job is keyed by the LinkedIn job ID of its URL. When the job is
+        already stored, its tracking fields (status, notes, ...) are kept, and
+        so are stored values of fields the new scrape is missing.
+        """
+        job_id = normalize_job_id(job['url'])
+        job = {**job, 'id': job_id}
+        conn = self._connection()
+        with self._write_lock:
+            stored = self._load(conn, job_id)
+            if stored is not None:
+                job.update({field: stored[field] for field in TRACKING_FIELDS if field in stored})
+                # Fields the page lacks (a closed posting has no description,
+                # so no analysis either) keep their stored value
+                job.update({
+                    key: stored[key] for key, _, _ in (*PAGE_FIELDS, *ANALYSIS_FIELDS)
+                    if job.get(key) in MISSING_JOB_VALUES and stored.get(key) not in MISSING_JOB_VALUES
+                })
+            rowid = self._write(conn, job_id, job)
+            self._mark_refreshed(conn, rowid, job)
+            conn.commit()
+        return job
+
+    def update(self, job_id, changes):
+        """Apply tracking field changes to a stored job; returns it, or None if unknown"""
+        unknown = set(changes) - set(TRACKING_FIELDS)
+        if unknown:
+            raise ValueError(f"Fields cannot be updated: {', '.join(sorted(unknown))}")
+        conn = self._connection()
+        with self._write_lock:
+            stored = self._load(conn, job_id)
+            if stored is None:
+                return None
+            job = {**stored, **changes}
+            self._write(conn, job_id, job)
+            conn.commit()
+        return job
+
+    def get(self, job_id):
+        """Return a stored job, or None"""
+        return self._load(self._connection(), job_id)
+
+    def delete(self, job_id):
+        """Remove a job; returns whether it was stored"""
+        conn = self._connection()
+        with self._write_lock:
+            row = conn.execute('SELECT rowid FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if row is None:
+                return False
+            for statement in ('DELETE FROM jobs WHERE rowid = ?',
+                              'DELETE FROM job_data WHERE job_rowid = ?',
+                              'DELETE FROM job_skills WHERE job_rowid = ?',
+                              'DELETE FROM jobs_fts WHERE rowid = ?',
+                              'DELETE FROM job_refresh WHERE job_rowid = ?'):
+                conn.execute(statement, row)
+            conn.execute('DELETE FROM job_changes WHERE job_id = ?', (job_id,))
+            conn.execute('DELETE FROM job_signatures WHERE job_id = ?', (job_id,))
+            conn.commit()
+        return True
+
+    def query(self, text=None, status=None, company=None, work_mode=None, experience_level=None,
+              skills=(), favorite=None, sort='created', descending=True, limit=20, offset=0):
+        """Return (total, jobs) for a filtered, sorted page of stored jobs
+
+        `text` is a full-text search over title, description and skills;
+        `sort='relevance'` orders the newest JOB_SEARCH_RANK_WINDOW matches by
+        rank, then older ones newest first. Every skill in `skills` must be
+        present. String filters are case-insensitive exact matches.
+        """
+        # Every filter is a source of rowids: the full-text index, one skill
+        # lookup per skill and the jobs table's own indexes. Only the sources
+        # a query needs are joined, driven by the first one. A full-text match
+        # must stay the outer loop (FTS5 re-runs MATCH for every outer row),
+        # so its joins are CROSS JOINs, which SQLite never reorders.
+        sources = []
+        params = []
+        match = fts_query(text) if text else None
+        if match:
+            sources.append(('jobs_fts', 'jobs_fts.rowid', 'jobs_fts MATCH ?'))
+            params.append(match)
+        for i, skill in enumerate(skills):
+            sources.append((f'job_skills s{i}', f's{i}.job_rowid', f's{i}.skill = ?'))
+            params.append(skill)
+
+        filters = []
+        for column, value in (('status', status), ('company', company),
+                              ('work_mode', work_mode), ('experience_level', experience_level)):
+            if value:
+                filters.append(f'jobs.{column} = ?')
+                params.append(value)
+        if favorite is not None:
+            filters.append('jobs.favorite = ?')
+            params.append(1 if favorite else 0)
+        if filters or not sources or sort in ('updated', 'title', 'company'):
+            sources.append(('jobs', 'jobs.rowid', ' AND '.join(filters)))
+
+        rowid = sources[0][1]
+        join = 'CROSS JOIN' if match else 'JOIN'
+        joins = [f'FROM {sources[0][0]}']
+        where = [sources[0][2]]
+        for table, other_rowid, condition in sources[1:]:
+            joins.append(f'{join} {table} ON {other_rowid} = {rowid}')
+            where.append(condition)
+        from_clause = ' '.join(joins)
+        where_clause = ' AND '.join(condition for condition in where if condition)
+        if where_clause:
+            from_clause += f' WHERE {where_clause}'
+
+        conn = self._connection()
+        total = conn.execute(f'SELECT COUNT(*) {from_clause}', params).fetchone()[0]
+        if sort == 'relevance' and match:
+            rowids = self._relevance_page(conn, match, from_clause, params, limit, offset)
+        else:
+            direction = 'DESC' if descending else 'ASC'
+            if sort in ('updated', 'title', 'company'):
+                order = f"{SORT_COLUMNS[sort]} {direction}"
+            else:
+                order = f'{rowid} {direction}'
+            rowids = [row[0] for row in conn.execute(
+                f'SELECT {rowid} {from_clause} ORDER BY {order} LIMIT ? OFFSET ?',
+                [*params, limit, offset]
+            )]
+        if not rowids:
+            return total, []
+
+        # Only the page's job objects are read, by rowid
+        data = dict(conn.execute(
+            f"SELECT job_rowid, data FROM job_data WHERE job_rowid IN ({','.join('?' * len(rowids))})",
+            rowids
+        ))
+        return total, [json.loads(data[rowid]) for rowid in rowids]
+
+    @staticmethod
+    def _relevance_page(conn, match, from_clause, params, limit, offset):
+        """Return a page of rowids: the newest JOB_SEARCH_RANK_WINDOW matches by rank, then older ones
+
+        bm25 is only computed and sorted inside the window, so the cost of a
+        relevance page does not grow with the number of matches.
+        """
+        cutoff = conn.execute(
+            'SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?',
+            (match, JOB_SEARCH_RANK_WINDOW - 1)
+        ).fetchone()
+        cutoff = cutoff[0] if cutoff else 0
+        ranked = conn.execute(f'SELECT COUNT(*) {from_clause} AND jobs_fts.rowid >= ?', [*params, cutoff]).fetchone()[0]
+
+        rowids = []
+        if offset < ranked:
+            rowids = [row[0] for row in conn.execute(
+                f'SELECT jobs_fts.rowid {from_clause} AND jobs_fts.rowid >= ? ORDER BY jobs_fts.rank LIMIT ? OFFSET ?',
+                [*params, cutoff, limit, offset]
+            )]
+        if len(rowids) < limit and cutoff:
+            rowids += [row[0] for row in conn.execute(
+                f'SELECT jobs_fts.rowid {from_clause} AND jobs_fts.rowid < ? ORDER BY jobs_fts.rowid DESC LIMIT ? OFFSET ?',
+                [*params, cutoff, limit - len(rowids), max(0, offset - ranked)]
+            )]
+        return rowids
+
+    def iter_jobs(self, batch_size=500):
+        """Yield every stored job, oldest first, streaming rows in batches"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            cursor = conn.execute('SELECT data FROM job_data ORDER BY job_rowid')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for (data,) in rows:
+                    yield json.loads(data)
+        finally:
+            conn.close()
+
+    def updated_since(self, since):
+        """Return [(updated_at, job)] for the jobs updated after `since` (a unix time), oldest first"""
+        rows = self._connection().execute(
+            '''SELECT jobs.updated_at, job_data.data FROM jobs
+               JOIN job_data ON job_data.job_rowid = jobs.rowid
+               WHERE jobs.updated_at > ? ORDER BY jobs.updated_at''',
+            (since,)
+        ).fetchall()
+        return [(updated_at, json.loads(data)) for updated_at, data in rows]
+
+    def claim_due_refresh(self, before, limit):
+        """Claim up to `limit` open jobs last refreshed before `before`, stalest first, and return them
+
+        Claimed jobs are marked refreshed in the same statement, so the
+        schedulers of other workers sharing the store do not fetch them too.
+        """
+        conn = self._connection()
+        with self._write_lock:
+            rowids = [row[0] for row in conn.execute(
+                '''UPDATE job_refresh SET refreshed_at = ?
+                   WHERE job_rowid IN (SELECT job_rowid FROM job_refresh
+                                       WHERE active = 1 AND refreshed_at < ?
+                                       ORDER BY refreshed_at LIMIT ?)
+                   RETURNING job_rowid''',
+                (time.time(), before, limit)
+            ).fetchall()]
+            conn.commit()
+        if not rowids:
+            return []
+        rows = conn.execute(
+            f"SELECT data FROM job_data WHERE job_rowid IN ({','.join('?' * len(rowids))})",
+            rowids
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def refresh_state(self, job_id):
+        """Return the stored (page fingerprint, description hash) of a job, or None"""
+        row = self._connection().execute(
+            '''SELECT job_refresh.fingerprint, job_refresh.description_hash FROM jobs
+               JOIN job_refresh ON job_refresh.job_rowid = jobs.rowid WHERE jobs.id = ?''',
+            (job_id,)
+        ).fetchone()
+        return row if row and row[0] else None
+
+    def touch_refresh(self, job_id, failed=False):
+        """Mark a job as refreshed without changes, or count a failed refresh"""
+        conn = self._connection()
+        with self._write_lock:
+            conn.execute(
+                '''UPDATE job_refresh SET refreshed_at = ?, failures = CASE WHEN ? THEN failures + 1 ELSE 0 END
+                   WHERE job_rowid = (SELECT rowid FROM jobs WHERE id = ?)''',
+                (time.time(), failed, job_id)
+            )
+            conn.commit()
+
+    def apply_refresh(self, job_id, values, state=None):
+        """Save re-scraped values for a job and log each field that changed
+
+        Values are merged into the job as currently stored, so tracking
+        fields edited while the page was being fetched are kept. `state`
+        is the (page fingerprint, description hash) to record instead of
+        the new values' own, so the next refresh sees the change again.
+        Returns the list of (field, old, new) changes.
+        """
+        conn = self._connection()
+        now = time.time()
+        with self._write_lock:
+            stored = self._load(conn, job_id)
+            if stored is None:
+                return []
+            changes = [(key, stored.get(key), value) for key, value in values.items() if stored.get(key) != value]
+            job = {**stored, **values}
+            rowid = self._write(conn, job_id, job)
+            self._mark_refreshed(conn, rowid, job, state)
+            conn.executemany(
+                'INSERT INTO job_changes (job_id, field, old, new, changed_at) VALUES (?, ?, ?, ?, ?)',
+                [(job_id, key, json.dumps(old), json.dumps(new), now) for key, old, new in changes]
+            )
+            conn.commit()
+        return changes
+
+    def changes(self, job_id=None, since=None, limit=100):
+        """Return logged field changes, newest first, for one job or all jobs"""
+        where = []
+        params = []
+        if job_id is not None:
+            where.append('job_id = ?')
+            params.append(job_id)
+        if since is not None:
+            where.append('changed_at > ?')
+            params.append(since)
+        where_clause = f"WHERE {' AND '.join(where)}" if where else ''
+        rows = self._connection().execute(
+            f'SELECT job_id, field, old, new, changed_at FROM job_changes {where_clause} ORDER BY id DESC LIMIT ?',
+            [*params, limit]
+        ).fetchall()
+        return [
+            {'jobId': job_id, 'field': field, 'old': json.loads(old), 'new': json.loads(new), 'changedAt': changed_at}
+            for job_id, field, old, new, changed_at in rows
+        ]
+
+    def save_signature(self, job_id, signature):
+        """Store the near-duplicate signature (bytes) of a job's description"""
+        conn = self._connection()
+        with self._write_lock:
+            conn.execute('INSERT OR REPLACE INTO job_signatures (job_id, signature) VALUES (?, ?)',
+                         (job_id, signature))
+            conn.commit()
+
+    def iter_signatures(self, batch_size=5000):
+        """Yield every stored (job ID, signature bytes) pair"""
+        cursor = self._connection().execute('SELECT job_id, signature FROM job_signatures')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    def count(self):
+        """Return the number of stored jobs"""
+        return self._connection().execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
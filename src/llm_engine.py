@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from analysis_parser import ANALYSIS_SCHEMA, AnalysisParseError, parse_analysis, repair_prompt
+from metrics import record_stage, stage
+
+logger = logging.getLogger(__name__)
+
+# Ollama settings
+OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://localhost:11434').rstrip('/')
+OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'llama2')
+LLM_CONCURRENCY = int(os.getenv('LLM_CONCURRENCY', '2'))
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '120'))
+
+# Constrained output: 'schema' sends the JSON schema (Ollama 0.5+), 'json'
+# requests JSON mode, 'none' leaves generation unconstrained
+LLM_OUTPUT_FORMAT = os.getenv('LLM_OUTPUT_FORMAT', 'json').lower()
+
+# Prompt template for job analysis
+ANALYSIS_TEMPLATE = """
+        Analyze the following job description and extract key information:
+
+        Job Description:
+        {job_description}
+
+        Please extract and format the following information:
+        1. Required Skills (as a list)
+        2. Experience Level (entry, mid, senior)
+        3. Key Responsibilities (as a list)
+        4. Estimated Salary Range (if mentioned)
+        5. Work Mode (remote, hybrid, onsite)
+
+        Format your response as a JSON object with these keys: Skills, Experience Level, Responsibilities, Salary Range, Work Mode
+        """
+
+# Prompt template for comparing two analyzed jobs
+COMPARE_TEMPLATE = """
+        Compare these two job descriptions and highlight the key differences:
+
+        JOB 1: {job1_analysis}
+
+        JOB 2: {job2_analysis}
+
+        Please compare them based on:
+        1. Required skills and experience
+        2. Job responsibilities
+        3. Company benefits and perks
+        4. Overall job attractiveness
+        """
+
+# Number of recent calls kept for latency percentiles
+LATENCY_WINDOW = 1000
+
+
+class AnalysisEngine:
+    """Long-lived client for the Ollama generate endpoint
+
+    One keep-alive HTTP session is shared by every analysis, so no per-call
+    setup is paid, and at most `concurrency` generations are sent to the
+    Ollama server at once.
+    """
+
+    def __init__(self, base_url=OLLAMA_HOST, model=OLLAMA_MODEL, template=ANALYSIS_TEMPLATE,
+                 concurrency=LLM_CONCURRENCY, timeout=LLM_TIMEOUT, output_format=LLM_OUTPUT_FORMAT):
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.template = template
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.output_format = {'schema': ANALYSIS_SCHEMA, 'json': 'json'}.get(output_format)
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._slots = threading.BoundedSemaphore(concurrency)
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._stats = {
+            'calls': 0,
+            'errors': 0,
+            'in_flight': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'latency_seconds_total': 0.0,
+            'parse_ok': 0,
+            'parse_repaired': 0,
+            'parse_failed': 0,
+        }
+
+    @property
+    def signature(self):
+        """Everything besides the model that shapes an analysis; used to key cached results"""
+        return self.template + json.dumps(ANALYSIS_SCHEMA, sort_keys=True)
+
+    def generate(self, prompt, output_format=None):
+        """Send one prompt to Ollama and return the response text"""
+        payload = {'model': self.model, 'prompt': prompt, 'stream': False}
+        if output_format:
+            payload['format'] = output_format
+
+        queued = time.monotonic()
+        with self._slots:
+            record_stage('llm_queue', time.monotonic() - queued)
+            with self._lock:
+                self._stats['in_flight'] += 1
+            started = time.monotonic()
+            try:
+                with stage('llm'):
+                    response = self._session.post(
+                        f"{self.base_url}/api/generate",
+                        json=payload,
+                        timeout=self.timeout
+                    )
+                    response.raise_for_status()
+                    data = response.json()
+            except Exception:
+                with self._lock:
+                    self._stats['errors'] += 1
+                raise
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self._stats['in_flight'] -= 1
+                    self._stats['calls'] += 1
+                    self._stats['latency_seconds_total'] += elapsed
+                    self._latencies.append(elapsed)
+
+        with self._lock:
+            self._stats['prompt_tokens'] += data.get('prompt_eval_count', 0)
+            self._stats['completion_tokens'] += data.get('eval_count', 0)
+        return data.get('response', '')
+
+    def analyze(self, job_description):
+        """Return the structured analysis of one job description
+
+        A reply that cannot be parsed gets one repair round trip asking the
+        model to rewrite it as valid JSON. Raises AnalysisParseError, carrying
+        the raw reply, if that fails too.
+        """
+        text = self.generate(self.template.format(job_description=job_description), self.output_format)
+        try:
+            analysis = parse_analysis(text)
+            self._count('parse_ok')
+            return analysis
+        except AnalysisParseError:
+            logger.warning("Could not parse AI analysis, asking the model to repair it")
+
+        try:
+            analysis = parse_analysis(self.generate(repair_prompt(text), self.output_format))
+            self._count('parse_repaired')
+            return analysis
+        except AnalysisParseError:
+            self._count('parse_failed')
+            raise AnalysisParseError("Could not parse AI analysis after repair", text)
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def metrics(self):
+        """Return call counts, token totals and latency percentiles"""
+        with self._lock:
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        calls = stats['calls'] or 1
+        parsed = stats['parse_ok'] + stats['parse_repaired'] + stats['parse_failed']
+        return {
+            'model': self.model,
+            'concurrency': self.concurrency,
+            **stats,
+            'avg_latency_seconds': stats['latency_seconds_total'] / calls,
+            'p50_latency_seconds': percentile(0.5),
+            'p95_latency_seconds': percentile(0.95),
+            'parse_success_rate': (stats['parse_ok'] + stats['parse_repaired']) / parsed if parsed else 0.0,
+        }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_analysis_engine():
+    """Return the shared analysis engine, creating it on first use"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AnalysisEngine()
+        return _engine
@@ -1,23 +1,28 @@
 import os
-import time
-import random
-import pandas as pd
-import streamlit as st
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
+import json
 from dotenv import load_dotenv
-from langchain.llms import Ollama
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
-from fake_useragent import UserAgent
 import logging
-import re
+import atexit
+import threading
+from contextlib import ExitStack, contextmanager
+import driver_factory
+import llm_engine
+import rate_limiter
+from driver_pool import DriverPool
+from driver_factory import get_driver_factory
+from job_cache import JobCache, normalize_job_id
+from job_store import ANALYSIS_FIELDS, JobStore, description_hash
+from refresh import RefreshScheduler
+from http_fetcher import (CAPTCHA_MARKERS, AuthWallError, RateLimitedError, fetch_public_job_html,
+                          fetch_public_search_html)
+from rate_limiter import RATE_LIMIT_WAIT_SECONDS, RateLimitTimeout, get_rate_limiter
+from metrics import stage
+from extractor import SEARCH_CARD_SELECTOR, field_selectors, job_extractor
+from search import iter_search_results, search_page_url, search_params
+from export import iter_csv
+from analysis_cache import AnalysisCache, analysis_key
+from analysis_parser import AnalysisParseError
+from llm_engine import COMPARE_TEMPLATE, get_analysis_engine
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -27,114 +32,115 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 USERNAME = os.getenv('LINKEDIN_USERNAME')
 PASSWORD = os.getenv('LINKEDIN_PASSWORD')
-PROXY_LIST = os.getenv('PROXY_LIST', '').split(',')
 
-# Initialize global cache for jobs
-jobs_cache = {}
+# Rate limiter key shared by the logged-in browser sessions
+BROWSER_RATE_KEY = 'linkedin-session'
 
-# Initialize streamlit session state cache if using streamlit
-if 'st' in globals():
-if 'jobs_cache' not in st.session_state:
-    st.session_state.jobs_cache = {}
+# WebDriver pool settings
+DRIVER_POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', '2'))
+DRIVER_MAX_USES = int(os.getenv('DRIVER_MAX_USES', '50'))
+DRIVER_MAX_AGE = int(os.getenv('DRIVER_MAX_AGE', '3600'))
 
-def initialize_langchain():
-    """Initialize and return a LangChain LLM chain for job analysis"""
-    try:
-        # Define the prompt template for job analysis
-        template = """
-        Analyze the following job description and extract key information:
-        
-        Job Description:
-        {job_description}
-        
-        Please extract and format the following information:
-        1. Required Skills (as a list)
-        2. Experience Level (entry, mid, senior)
-        3. Key Responsibilities (as a list)
-        4. Estimated Salary Range (if mentioned)
-        5. Work Mode (remote, hybrid, onsite)
-        
-        Format your response as a JSON object with these keys: Skills, Experience Level, Responsibilities, Salary Range, Work Mode
-        """
-        
-        prompt = PromptTemplate(
-            input_variables=["job_description"],
-            template=template
-        )
-        
-        # Initialize the Ollama LLM
-        llm = Ollama(model="llama2")
-        
-        # Create and return the chain
-        return LLMChain(llm=llm, prompt=prompt)
-    except Exception as e:
-        logger.error(f"Error initializing LangChain: {e}")
-        # Return a mock chain if there's an error
-        return None
+# Fetch mode: 'auto' tries plain HTTP first and falls back to Selenium,
+# 'http' never launches a browser, 'selenium' always does
+FETCH_MODE = os.getenv('FETCH_MODE', 'auto').lower()
+
+# Fields that must be present for a plain-HTTP page to be used as is, and
+# that a browser waits for before its page is scraped
+REQUIRED_FIELDS = ('Company Name', 'Job Title', 'Job Description')
+# Closed postings drop their description; these identify them
+CLOSED_REQUIRED_FIELDS = ('Company Name', 'Job Title')
+
+# URL parts of the pages LinkedIn sends logged-out browsers to
+LOGIN_WALL_MARKERS = ('/login', '/authwall', '/checkpoint')
+
+# True once the page a browser is loading is parsed and has an element for
+# every selector in arguments[0], or has landed on a login wall. Documents
+# flagged stale are the previous page, before navigation commits.
+_PAGE_READY_SCRIPT = '''
+    if (window.__trackerStale || document.readyState === 'loading') return false;
+    if (arguments[1].some(marker => location.href.includes(marker))) return true;
+    return arguments[0].every(selector => document.querySelector(selector) !== null);
+'''
+
+# Job cache settings
+JOB_CACHE_PATH = os.getenv('JOB_CACHE_PATH', 'job_cache.db')
+JOB_CACHE_TTL = int(os.getenv('JOB_CACHE_TTL', '86400'))
+JOB_CACHE_MEMORY_MB = int(os.getenv('JOB_CACHE_MEMORY_MB', '64'))
+
+# Content-addressed AI analysis cache settings
+ANALYSIS_CACHE_PATH = os.getenv('ANALYSIS_CACHE_PATH', JOB_CACHE_PATH)
+ANALYSIS_CACHE_MAX_MB = int(os.getenv('ANALYSIS_CACHE_MAX_MB', '32'))
+
+# Tracked job store location
+JOB_STORE_PATH = os.getenv('JOB_STORE_PATH', 'jobs.db')
+
+# Shared job cache, created on first use
+_job_cache = None
+_job_cache_lock = threading.Lock()
+
+# Shared job store, created on first use
+_job_store = None
+_job_store_lock = threading.Lock()
+
+# Shared near-duplicate index of scraped descriptions, created on first use
+_duplicate_index = None
+_duplicate_index_lock = threading.Lock()
 
-def get_random_proxy():
-    """Return a random proxy from the list if available"""
-    if PROXY_LIST and PROXY_LIST[0]:
-        return random.choice(PROXY_LIST)
-    return None
+# Shared similarity index of tracked jobs, created on first use and synced
+# with the job store's updated_at on every use
+_similarity_index = None
+_similarity_synced_at = 0
+_similarity_index_lock = threading.Lock()
+
+# Shared refresh scheduler, created on first use
+_refresh_scheduler = None
+_refresh_scheduler_lock = threading.Lock()
+
+# Shared analysis cache, created on first use
+_analysis_cache = None
+_analysis_cache_lock = threading.Lock()
+
+# Shared pool of logged-in WebDrivers, created on first use
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+
+# Selenium and fake_useragent take seconds to import and the
+# NumPy-backed indexes a tenth of one, so they are imported by the functions
+# that use them: importing this module (and starting the API) stays cheap,
+# and the HTTP fetch path never loads Selenium.
 
 def setup_driver(headless=True, use_proxy=False):
     """Set up and return a configured Selenium WebDriver"""
-    options = Options()
-    if headless:
-        options.add_argument('--headless')
-    
-    # Add random user agent to avoid detection
-    user_agent = UserAgent().random
-    options.add_argument(f'--user-agent={user_agent}')
-    
-    # Add proxy if requested
-    if use_proxy:
-        proxy = get_random_proxy()
-        if proxy:
-            options.add_argument(f'--proxy-server={proxy}')
-    
-    # Add additional options to avoid detection
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_experimental_option('excludeSwitches', ['enable-automation'])
-    options.add_experimental_option('useAutomationExtension', False)
-    
-    # Create and return the driver
-    driver = webdriver.Chrome(options=options)
-    
-    # Execute CDP commands to avoid detection
-    driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": user_agent})
-    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-        'source': '''
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            })
-        '''
-    })
-    
-    return driver
+    # Add the healthiest proxy if requested
+    proxy = get_rate_limiter().pick_proxy(BROWSER_RATE_KEY) if use_proxy else None
+    return get_driver_factory().create(headless=headless, proxy=proxy)
 
 def linkedin_login(driver):
     """Log in to LinkedIn with error handling"""
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
     try:
-        driver.get("https://www.linkedin.com/login")
-        wait = WebDriverWait(driver, 10)
-        
-        # Wait for email input field and enter username
-        email_input = wait.until(EC.presence_of_element_located((By.ID, 'username')))
-        email_input.send_keys(USERNAME)
-        
-        # Enter password
-        password_input = driver.find_element(By.ID, 'password')
-        password_input.send_keys(PASSWORD)
-        
-        # Submit login form
-        password_input.submit()
-        
-        # Wait for login to complete
-        wait.until(EC.url_contains('feed'))
+        with stage('login'):
+            driver.get("https://www.linkedin.com/login")
+            wait = WebDriverWait(driver, 10)
+            
+            # Wait for email input field and enter username
+            email_input = wait.until(EC.presence_of_element_located((By.ID, 'username')))
+            email_input.send_keys(USERNAME)
+            
+            # Enter password
+            password_input = driver.find_element(By.ID, 'password')
+            password_input.send_keys(PASSWORD)
+            
+            # Submit login form
+            password_input.submit()
+            
+            # Wait for login to complete
+            wait.until(EC.url_contains('feed'))
         logger.info("Successfully logged in to LinkedIn")
         return True
     
@@ -145,276 +151,524 @@ def linkedin_login(driver):
         logger.error(f"Login failed: {str(e)}")
         return False
 
-def scrape_job_info(url, use_langchain=True):
-    """Scrape job information from LinkedIn job posting URL"""
-    # Check if job is already in cache
-    if 'jobs_cache' in globals() and url in jobs_cache:
-        return jobs_cache[url]
-    
-    driver = setup_driver(headless=True, use_proxy=False)
-    job_info = {}
+def _login_if_configured(driver):
+    """Log a pooled driver in when LinkedIn credentials are configured"""
+    if USERNAME and PASSWORD:
+        # Skipped while the browser's profile holds a valid saved session
+        if not get_driver_factory().login(driver, linkedin_login):
+            logger.warning("Login failed. Pooled driver will scrape without login.")
+            return False
+        return True
+    return False
+
+def _session_active(driver):
+    """Return False once LinkedIn has bounced a driver back to a login wall, dropping its saved session"""
+    url = driver.current_url
+    if any(marker in url for marker in LOGIN_WALL_MARKERS):
+        get_driver_factory().forget_session(driver)
+        return False
+    return True
+
+def get_driver_pool():
+    """Return the shared WebDriver pool, creating it on first use"""
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool(
+                factory=lambda: setup_driver(headless=True, use_proxy=True),
+                login=_login_if_configured,
+                session_check=_session_active,
+                dispose=get_driver_factory().quit,
+                size=DRIVER_POOL_SIZE,
+                max_uses=DRIVER_MAX_USES,
+                max_age=DRIVER_MAX_AGE
+            )
+            atexit.register(_driver_pool.close)
+        return _driver_pool
+
+def component_metrics():
+    """Return the metrics() snapshot of every shared component created so far"""
+    components = {
+        'job_cache': _job_cache,
+        'analysis_cache': _analysis_cache,
+        'driver_pool': _driver_pool,
+        'refresh': _refresh_scheduler,
+        'llm': llm_engine._engine,
+        'driver_factory': driver_factory._factory,
+        'rate_limiter': rate_limiter._limiter,
+    }
+    return {name: component.metrics() for name, component in components.items() if component is not None}
+
+def get_job_cache():
+    """Return the shared job cache, creating it on first use"""
+    global _job_cache
+    with _job_cache_lock:
+        if _job_cache is None:
+            _job_cache = JobCache(
+                JOB_CACHE_PATH,
+                ttl=JOB_CACHE_TTL,
+                max_memory_bytes=JOB_CACHE_MEMORY_MB * 1024 * 1024
+            )
+        return _job_cache
+
+def get_job_store():
+    """Return the shared tracked job store, creating it on first use"""
+    global _job_store
+    with _job_store_lock:
+        if _job_store is None:
+            _job_store = JobStore(JOB_STORE_PATH)
+        return _job_store
+
+def get_duplicate_index():
+    """Return the shared near-duplicate index, loading stored signatures on first use"""
+    global _duplicate_index
+    with _duplicate_index_lock:
+        if _duplicate_index is None:
+            from dedup import NearDuplicateIndex
+
+            index = NearDuplicateIndex()
+            index.load(get_job_store().iter_signatures())
+            _duplicate_index = index
+        return _duplicate_index
+
+def has_description(job_description):
+    """Check that a job description was actually scraped, not a placeholder"""
+    return job_description not in (None, '', 'Not available')
+
+def find_duplicate(job_id, job_description):
+    """Index a job's description and return (job ID, similarity) of its closest near-duplicate, or None"""
+    if not has_description(job_description):
+        return None
+    index = get_duplicate_index()
+    digest = description_hash(job_description)
+    signature = index.get(job_id, digest)
+    if signature is None:
+        # New or changed description, or first seen since the index was loaded
+        signature = index.signature(job_description)
+        stored = index.get(job_id)
+        index.add(job_id, signature, digest)
+        if stored is None or stored.tobytes() != signature.tobytes():
+            get_job_store().save_signature(job_id, signature.tobytes())
+    matches = index.query(signature, exclude=job_id)
+    return matches[0] if matches else None
+
+def duplicate_analysis(job_id):
+    """Return the AI analysis already made for a job, from the cache or the job store, or None"""
+    analysis = get_job_cache().get('analysis', job_id)
+    if analysis is not None:
+        return analysis
+    job = get_job_store().get(job_id)
+    if job is None:
+        return None
+    analysis = {field: job[key] for key, field, default in ANALYSIS_FIELDS if job.get(key, default) != default}
+    return analysis or None
+
+@contextmanager
+def paced_browser():
+    """Yield (driver, lease): a rate limiter lease for the next page load, then a pooled driver
+
+    The lease is taken first, so no driver is tied up while its route backs
+    off. A driver on the lease's proxy is preferred, and the lease follows
+    the driver's proxy otherwise. Raises RateLimitTimeout when no route frees
+    up within RATE_LIMIT_WAIT_SECONDS.
+    """
+    lease = get_rate_limiter().lease(BROWSER_RATE_KEY, timeout=RATE_LIMIT_WAIT_SECONDS)
+    with ExitStack() as stack:
+        try:
+            driver = stack.enter_context(get_driver_pool().driver(
+                prefer=lambda pooled: getattr(pooled, 'route_proxy', None) == lease.proxy
+            ))
+        except Exception:
+            # No page was requested, so the route is not to blame
+            lease.cancel()
+            raise
+        with lease:
+            lease.bind(getattr(driver, 'route_proxy', None))
+            yield driver, lease
+
+def check_browser_page(driver, lease):
+    """Report login walls and CAPTCHAs to the rate limiter and raise instead of returning them"""
+    if not _session_active(driver):
+        lease.throttled('auth_wall')
+        raise AuthWallError(f"Redirected to {driver.current_url}")
+    if any(marker in driver.page_source for marker in CAPTCHA_MARKERS):
+        lease.throttled('captcha')
+        raise RateLimitedError("LinkedIn served a CAPTCHA instead of the page")
+
+def wait_for_selectors(driver, selectors, timeout=10):
+    """Wait until the loading page has every selector group or hits a login wall; returns whether it did"""
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script(_PAGE_READY_SCRIPT, selectors, LOGIN_WALL_MARKERS)
+        )
+        return True
+    except TimeoutException:
+        return False
+
+def fetch_job_html(url):
+    """Load a LinkedIn job posting in a pooled driver and return its page source"""
+    # Borrow an already logged-in driver from the pool, paced by the rate
+    # limiter for this session and proxy
+    with paced_browser() as (driver, lease):
+        with stage('navigation'):
+            # Depending on the page load strategy, get() may return before
+            # the new document replaces this one
+            driver.execute_script('window.__trackerStale = true')
+            driver.get(url)
+            # Only the fields the extractor needs are waited for, not
+            # every image, font and script on the page
+            if not wait_for_selectors(driver, field_selectors(REQUIRED_FIELDS)):
+                logger.info(f"Job fields did not appear on {url}, scraping the page as loaded")
+        check_browser_page(driver, lease)
+        return driver.page_source
+
+def parse_job_html(html, url):
+    """Extract the job fields from a LinkedIn job posting page"""
+    # All fields are pulled out in a single pass over the parsed page
+    with stage('parse'):
+        job_info = job_extractor.extract(html)
+    job_info['URL'] = url
+    return job_info
+
+def has_required_fields(job_info):
+    """Check that parsing found every field the tracker cannot do without, or a closed posting"""
+    required = CLOSED_REQUIRED_FIELDS if job_info.get('Closed') else REQUIRED_FIELDS
+    return all(job_info.get(field) not in (None, "Not specified", "Not available")
+               for field in required)
+
+def get_analysis_cache():
+    """Return the shared content-addressed analysis cache, creating it on first use"""
+    global _analysis_cache
+    with _analysis_cache_lock:
+        if _analysis_cache is None:
+            _analysis_cache = AnalysisCache(
+                ANALYSIS_CACHE_PATH,
+                get_analysis_engine().signature,
+                max_bytes=ANALYSIS_CACHE_MAX_MB * 1024 * 1024
+            )
+        return _analysis_cache
+
+def _analysis_cache_key(job_description):
+    engine = get_analysis_engine()
+    return analysis_key(job_description, engine.model, engine.signature)
+
+def analyze_job_description(job_description):
+    """Run the AI analysis on a job description and return the extracted fields"""
+    # Identical descriptions (reposts, other locations, URL variants) share one analysis
+    cache = get_analysis_cache()
+    key = _analysis_cache_key(job_description)
+    analysis = cache.get(key)
+    if analysis is not None:
+        return analysis
     
     try:
-        # Login if credentials are provided
-        if USERNAME and PASSWORD:
-            if not linkedin_login(driver):
-                logger.warning("Login failed. Attempting to scrape without login.")
-        
-        # Navigate to job URL with random delay to avoid detection
-        driver.get(url)
-        time.sleep(random.uniform(2, 5))
-        
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
-        
-        # Parse the page with BeautifulSoup
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        # Extract job data with better error handling
+        logger.info("Analyzing job description with AI...")
+        analysis = get_analysis_engine().analyze(job_description)
+    except AnalysisParseError as e:
+        logger.error(f"Error parsing AI analysis: {e}")
+        # Store the raw analysis if parsing fails; it is not cached so it is retried
+        return {'AI Analysis': e.text}
+    except Exception as e:
+        logger.error(f"Error during AI analysis: {e}")
+        return {}
+    
+    cache.put(key, analysis)
+    return analysis
+
+def fetch_job_page(url):
+    """Fetch a job posting, preferring the plain-HTTP public page over Selenium
+    
+    Returns (html, fields). `fields` holds the parsed public page when it had
+    every required field, and is None when the page came from Selenium and
+    still needs parsing.
+    """
+    if FETCH_MODE != 'selenium':
         try:
-            # Company name - multiple possible classes
-            company_name_elem = soup.select_one('.topcard__org-name-link, .jobs-unified-top-card__company-name, .jobs-unified-top-card__subtitle-primary-grouping a')
-            company_name = company_name_elem.text.strip() if company_name_elem else "Not specified"
-            
-            # Job title
-            job_title_elem = soup.select_one('.topcard__title, .jobs-unified-top-card__job-title, .jobs-unified-top-card__title')
-            job_title = job_title_elem.text.strip() if job_title_elem else "Not specified"
-            
-            # Job description
-            job_desc_elem = soup.select_one('.description__text, .jobs-description-content, .jobs-description__content')
-            job_description = job_desc_elem.text.strip() if job_desc_elem else "Not available"
-            
-            # Location
-            location_elem = soup.select_one('.topcard__flavor--bullet, .jobs-unified-top-card__workplace-type, .jobs-unified-top-card__subtitle-primary-grouping .jobs-unified-top-card__bullet')
-            location = location_elem.text.strip() if location_elem else "Not specified"
-            
-            # Posted date
-            date_elem = soup.select_one('.posted-time-ago__text, .jobs-unified-top-card__posted-date, .jobs-unified-top-card__subtitle-secondary-grouping .jobs-unified-top-card__posted-date')
-            date_posted = date_elem.text.strip() if date_elem else "Not specified"
-            
-            # Job type
-            job_type_elem = soup.select_one('.topcard__flavor--bullet:nth-of-type(2), .jobs-unified-top-card__job-insight:nth-of-type(1), .jobs-unified-top-card__subtitle-primary-grouping .jobs-unified-top-card__workplace-type')
-            job_type = job_type_elem.text.strip() if job_type_elem else "Not specified"
-            
-            # Number of applicants
-            applicants_elem = soup.select_one('.num-applicants__caption, .jobs-unified-top-card__applicant-count, .jobs-unified-top-card__subtitle-secondary-grouping .jobs-unified-top-card__applicant-count')
-            applicants = applicants_elem.text.strip() if applicants_elem else "Not specified"
-            
-            # Construct job info dictionary
-            job_info = {
-                'Company Name': company_name,
-                'Job Title': job_title,
-                'Job Description': job_description,
-                'Location': location,
-                'Date Posted': date_posted,
-                'Job Type': job_type,
-                'Applicants': applicants,
-                'URL': url
-            }
-            
-            # Use LangChain to analyze job description if enabled
-            if use_langchain and 'Job Description' in job_info:
-                try:
-                langchain = initialize_langchain()
-                if langchain:
-                        logger.info("Analyzing job description with AI...")
-                        analysis_text = langchain.run(job_description=job_info['Job Description'])
-                        
-                        # Try to parse the analysis as JSON-like format
-                        try:
-                            # Extract skills
-                            skills_match = re.search(r'Skills:?\s*\[(.*?)\]', analysis_text, re.DOTALL)
-                            if skills_match:
-                                skills_text = skills_match.group(1)
-                                skills = [s.strip().strip('"\'') for s in skills_text.split(',')]
-                                job_info['Skills'] = skills
-                            
-                            # Extract experience level
-                            exp_match = re.search(r'Experience Level:?\s*["\']?(.*?)["\']?[,\n]', analysis_text)
-                            if exp_match:
-                                job_info['Experience Level'] = exp_match.group(1).strip()
-                            
-                            # Extract responsibilities
-                            resp_match = re.search(r'Responsibilities:?\s*\[(.*?)\]', analysis_text, re.DOTALL)
-                            if resp_match:
-                                resp_text = resp_match.group(1)
-                                responsibilities = [r.strip().strip('"\'') for r in resp_text.split(',')]
-                                job_info['Responsibilities'] = responsibilities
-                            
-                            # Extract salary range
-                            salary_match = re.search(r'Salary Range:?\s*["\']?(.*?)["\']?[,\n]', analysis_text)
-                            if salary_match:
-                                job_info['Salary Range'] = salary_match.group(1).strip()
-                            
-                            # Extract work mode
-                            mode_match = re.search(r'Work Mode:?\s*["\']?(.*?)["\']?[,\n]', analysis_text)
-                            if mode_match:
-                                job_info['Work Mode'] = mode_match.group(1).strip()
-                                
-                        except Exception as e:
-                            logger.error(f"Error parsing AI analysis: {e}")
-                            # Store the raw analysis if parsing fails
-                            job_info['AI Analysis'] = analysis_text
-                except Exception as e:
-                    logger.error(f"Error during AI analysis: {e}")
-            
-            # Cache the result
-            if 'jobs_cache' in globals():
-                jobs_cache[url] = job_info
-            
+            with stage('http_fetch'):
+                html = fetch_public_job_html(url)
+            fields = parse_job_html(html, url)
+            if has_required_fields(fields):
+                return html, fields
+            if FETCH_MODE == 'http':
+                raise Exception("Public job page is missing required fields")
+            logger.info("Public job page is missing required fields, falling back to Selenium")
         except Exception as e:
-            logger.error(f"Error extracting job data: {str(e)}")
-            raise Exception(f"Could not extract all job data: {str(e)}")
+            if FETCH_MODE == 'http':
+                raise
+            logger.warning(f"Plain HTTP fetch failed, falling back to Selenium: {e}")
     
+    return fetch_job_html(url), None
+
+def fetch_job_stage(item):
+    """Load cached fields or page HTML for a job, fetching the page only on a miss"""
+    cache = get_job_cache()
+    item['fields'] = cache.get('fields', item['job_id'])
+    if item['fields'] is None:
+        item['html'] = cache.get('html', item['job_id'])
+        item['fetched'] = item['html'] is None
+        if item['fetched']:
+            item['html'], item['fields'] = fetch_job_page(item['url'])
+    return item
+
+def parse_job_stage(item):
+    """Extract job fields from the HTML loaded by fetch_job_stage"""
+    if 'html' in item:
+        html = item.pop('html')
+        if item['fields'] is None:
+            try:
+                item['fields'] = parse_job_html(html, item['url'])
+            except Exception as e:
+                logger.error(f"Error extracting job data: {str(e)}")
+                raise Exception(f"Could not extract all job data: {str(e)}")
+        
+        # Only cache complete pages, so blank pages and login walls are not
+        # served from the cache until they expire
+        if not has_required_fields(item['fields']):
+            raise Exception("Job page is missing required fields")
+        cache = get_job_cache()
+        if item['fetched']:
+            cache.put('html', item['job_id'], html)
+        cache.put('fields', item['job_id'], item['fields'])
+    return item
+
+def analyze_job_stage(item):
+    """Add the (cached) AI analysis to the parsed fields as item['job_info']"""
+    # Copy so the cached fields entry is not mutated
+    job_info = dict(item['fields'])
+    
+    # Without a description there is nothing to compare or analyze
+    if not has_description(job_info.get('Job Description')):
+        item['job_info'] = job_info
+        return item
+    
+    # Flag reposts of an already scraped posting under another job ID
+    duplicate = None
+    try:
+        duplicate = find_duplicate(item['job_id'], job_info['Job Description'])
     except Exception as e:
-        logger.error(f"Error scraping job: {str(e)}")
-        raise Exception(f"Error accessing the job listing: {str(e)}")
+        logger.error(f"Error checking for duplicate jobs: {str(e)}")
+    if duplicate:
+        job_info['Duplicate Of'] = duplicate[0]
     
-    finally:
-        driver.quit()
+    # Run the AI analysis on the job description if enabled
+    if item['use_langchain']:
+        cache = get_job_cache()
+        analysis = cache.get('analysis', item['job_id'])
+        if analysis is None and duplicate:
+            # A near-duplicate's analysis stands in for a new LLM call
+            analysis = duplicate_analysis(duplicate[0])
+            if analysis is not None:
+                logger.info(f"Reusing analysis of near-duplicate job {duplicate[0]} ({duplicate[1]:.2f} similar)")
+                cache.put('analysis', item['job_id'], analysis)
+        if analysis is None:
+            analysis = analyze_job_description(job_info['Job Description'])
+            # Keep failed analyses out of the cache so they are retried
+            if analysis and 'AI Analysis' not in analysis:
+                cache.put('analysis', item['job_id'], analysis)
+        job_info.update(analysis)
     
-    return job_info
+    item['job_info'] = job_info
+    return item
 
-def search_jobs(keywords, location, job_type=None, experience_level=None, max_pages=3):
-    """Search for jobs on LinkedIn based on keywords and filters"""
-    driver = setup_driver(headless=True)
-    all_jobs = []
+def new_job_item(url, use_langchain=True):
+    """Return the work item threaded through the fetch, parse and analyze stages"""
+    return {'url': url, 'job_id': normalize_job_id(url), 'use_langchain': use_langchain}
+
+def fetch_current_job_fields(url):
+    """Fetch and parse the live version of a job posting, dropping its cached page"""
+    html, fields = fetch_job_page(url)
+    if fields is None:
+        fields = parse_job_html(html, url)
+        if not has_required_fields(fields):
+            raise Exception("Job page is missing required fields")
+    # The next scrape fetches the live page rather than the one cached before
+    get_job_cache().invalidate(normalize_job_id(url), ('html', 'fields'))
+    return fields
+
+def reanalyze_job(url, job_description):
+    """Analyze a changed job description, replacing the job's cached analysis"""
+    analysis = analyze_job_description(job_description)
+    # Keep failed analyses out of the cache so they are retried
+    if analysis and 'AI Analysis' not in analysis:
+        get_job_cache().put('analysis', normalize_job_id(url), analysis)
+    return analysis
+
+def get_refresh_scheduler():
+    """Return the shared refresh scheduler for tracked jobs, creating it on first use"""
+    global _refresh_scheduler
+    with _refresh_scheduler_lock:
+        if _refresh_scheduler is None:
+            _refresh_scheduler = RefreshScheduler(get_job_store(), fetch_current_job_fields, reanalyze_job)
+        return _refresh_scheduler
+
+def scrape_job_info(url, use_langchain=True):
+    """Scrape job information from LinkedIn job posting URL"""
+    item = new_job_item(url, use_langchain)
     
     try:
-        # Login if credentials are provided
-        if USERNAME and PASSWORD:
-            linkedin_login(driver)
-        
-        # Construct search URL
-        base_url = "https://www.linkedin.com/jobs/search/?"
-        params = f"keywords={keywords.replace(' ', '%20')}&location={location.replace(' ', '%20')}"
-        
-        if job_type:
-            params += f"&f_JT={job_type}"
-        if experience_level:
-            params += f"&f_E={experience_level}"
-        
-        search_url = base_url + params
-        driver.get(search_url)
-        time.sleep(random.uniform(2, 4))
-        
-        # Process each page up to max_pages
-        for page in range(1, max_pages + 1):
-            progress_text = f"Scraping page {page} of {max_pages}..."
-            progress_bar = st.progress(0)
-            
-            try:
-                # Wait for job listings to load
-                wait = WebDriverWait(driver, 10)
-                job_cards = wait.until(EC.presence_of_all_elements_located(
-                    (By.CSS_SELECTOR, ".job-search-card, .jobs-search-results__list-item")
-                ))
-                
-                # Process each job card
-                for i, job_card in enumerate(job_cards):
-                    progress_bar.progress((i + 1) / len(job_cards))
-                    
-                    try:
-                        # Extract basic job info from the card
-                        title_elem = job_card.find_element(By.CSS_SELECTOR, ".job-card-list__title, .job-search-card__title")
-                        title = title_elem.text.strip()
-                        
-                        company_elem = job_card.find_element(By.CSS_SELECTOR, ".job-card-container__company-name, .job-search-card__company-name")
-                        company = company_elem.text.strip()
-                        
-                        location_elem = job_card.find_element(By.CSS_SELECTOR, ".job-card-container__metadata-item, .job-search-card__location")
-                        location_text = location_elem.text.strip()
-                        
-                        # Get job URL
-                        link_elem = job_card.find_element(By.CSS_SELECTOR, ".job-card-list__title, .job-search-card__title")
-                        job_url = link_elem.get_attribute("href")
-                        
-                        # Add to job list
-                        all_jobs.append({
-                            'Job Title': title,
-                            'Company': company,
-                            'Location': location_text,
-                            'URL': job_url
-                        })
-                        
-                        # Add small delay between processing cards
-                        time.sleep(random.uniform(0.2, 0.5))
-                    
-                    except Exception as e:
-                        logger.warning(f"Error processing job card: {str(e)}")
-                        continue
-                
-                # Complete progress for this page
-                progress_bar.progress(1.0)
-                
-                # Go to next page if not on the last page
-                if page < max_pages:
-                    try:
-                        next_button = driver.find_element(By.CSS_SELECTOR, ".artdeco-pagination__button--next")
-                        if next_button.is_enabled():
-                            next_button.click()
-                            time.sleep(random.uniform(2, 4))
-                        else:
-                            logger.info("No more pages available")
-                            break
-                    except NoSuchElementException:
-                        logger.info("No pagination found or no more pages")
-                        break
-            
-            except Exception as e:
-                logger.error(f"Error processing page {page}: {str(e)}")
-                st.error(f"Error processing page {page}: {str(e)}")
-                break
-    
+        item = parse_job_stage(fetch_job_stage(item))
+    except (RateLimitedError, RateLimitTimeout):
+        # Retryable; the caller can tell the client when to come back
+        raise
     except Exception as e:
-        logger.error(f"Error in job search: {str(e)}")
-        st.error(f"Error searching for jobs: {str(e)}")
+        logger.error(f"Error scraping job: {str(e)}")
+        raise Exception(f"Error accessing the job listing: {str(e)}")
     
-    finally:
-        driver.quit()
+    return analyze_job_stage(item)['job_info']
+
+def fetch_search_html(params, start):
+    """Load a search results page in a pooled driver and return its page source"""
+    with paced_browser() as (driver, lease), stage('navigation'):
+        driver.execute_script('window.__trackerStale = true')
+        driver.get(search_page_url(params, start))
+        if wait_for_selectors(driver, [SEARCH_CARD_SELECTOR]) and _session_active(driver):
+            # The logged-in list only renders cards once they have been scrolled into view
+            driver.execute_script(
+                "document.querySelectorAll('.jobs-search-results__list-item')"
+                ".forEach(card => card.scrollIntoView());"
+            )
+        else:
+            logger.info(f"No job cards found at offset {start}")
+            check_browser_page(driver, lease)
+        return driver.page_source
+
+def fetch_search_page(params, start):
+    """Fetch one page of search results, preferring the public card list over Selenium"""
+    if FETCH_MODE != 'selenium':
+        try:
+            with stage('http_fetch'):
+                return fetch_public_search_html({**params, 'start': start})
+        except Exception as e:
+            if FETCH_MODE == 'http':
+                raise
+            logger.warning(f"Plain HTTP search failed, falling back to Selenium: {e}")
     
-    return all_jobs
+    return fetch_search_html(params, start)
+
+def iter_search_jobs(keywords, location, job_type=None, experience_level=None, max_pages=3):
+    """Search for jobs on LinkedIn, yielding each job card as soon as its page is parsed
+    
+    Result pages are fetched in parallel by `start=` offset and every card on
+    a page is parsed in one pass over its HTML.
+    """
+    params = search_params(keywords, location, job_type, experience_level)
+    return iter_search_results(params, fetch_search_page, max_pages=max_pages)
+
+def search_jobs(keywords, location, job_type=None, experience_level=None, max_pages=3):
+    """Search for jobs on LinkedIn based on keywords and filters
+    
+    A page that fails ends the search with the jobs found before it.
+    """
+    jobs = []
+    try:
+        jobs.extend(iter_search_jobs(keywords, location, job_type, experience_level, max_pages))
+    except Exception:
+        pass
+    return jobs
 
 def export_to_csv(data):
     """Export job data to CSV file"""
-    df = pd.DataFrame(data)
-    return df.to_csv(index=False).encode('utf-8')
+    # Columns are every key seen, in order of first appearance
+    headers = list(dict.fromkeys(key for row in data for key in row))
+    rows = iter_csv(data, headers, lambda row: [row.get(header, '') for header in headers])
+    return ''.join(rows).encode('utf-8')
 
-def compare_jobs(job1, job2):
-    """Compare two jobs and highlight differences"""
+def compare_jobs(job1, job2, explain=True):
+    """Compare two jobs and highlight differences
+    
+    Jobs may be scraped job_info dicts or stored job objects. Besides the
+    field-by-field comparison, 'Similarity' holds their feature similarity
+    score and, with `explain`, 'AI Comparison' the model's summary of how
+    they differ.
+    """
     if not job1 or not job2:
         return "One or both jobs are missing data."
     
     comparison = {}
     
     for key in set(job1.keys()) & set(job2.keys()):
-        if key != 'AI Analysis' and key != 'Job Description':
+        if key not in ('AI Analysis', 'Job Description', 'description'):
             comparison[key] = {
                 'Job 1': job1.get(key, 'N/A'),
                 'Job 2': job2.get(key, 'N/A'),
                 'Same': job1.get(key) == job2.get(key)
             }
+    from similarity import job_similarity
+
+    comparison['Similarity'] = job_similarity(job1, job2)
     
-    # If we have AI Analysis, use LangChain to compare the jobs
-    if 'AI Analysis' in job1 and 'AI Analysis' in job2:
-        llm = Ollama(model="llama2")
-        compare_template = """
-        Compare these two job descriptions and highlight the key differences:
-        
-        JOB 1: {job1_analysis}
-        
-        JOB 2: {job2_analysis}
-        
-        Please compare them based on:
-        1. Required skills and experience
-        2. Job responsibilities
-        3. Company benefits and perks
-        4. Overall job attractiveness
-        """
-        
-        prompt = PromptTemplate(
-            input_variables=["job1_analysis", "job2_analysis"],
-            template=compare_template,
+    # Only the pairs worth a closer look are sent to the model
+    if explain:
+        prompt = COMPARE_TEMPLATE.format(
+            job1_analysis=comparison_summary(job1),
+            job2_analysis=comparison_summary(job2)
         )
-        
-        chain = LLMChain(llm=llm, prompt=prompt)
\ No newline at end of file
+        try:
+            comparison['AI Comparison'] = get_analysis_engine().generate(prompt)
+        except Exception as e:
+            logger.error(f"Error during AI comparison: {str(e)}")
+    
+    return comparison
+
+def comparison_summary(job):
+    """Return the title, company and AI analysis of a job as text for the comparison prompt"""
+    summary = {
+        'Job Title': job.get('title', job.get('Job Title')),
+        'Company Name': job.get('company', job.get('Company Name')),
+    }
+    for key, field, _ in ANALYSIS_FIELDS:
+        summary[field] = job.get(key, job.get(field))
+    return json.dumps(summary)
+
+def get_similarity_index():
+    """Return the shared similarity index of tracked jobs, brought up to date with the job store"""
+    global _similarity_index, _similarity_synced_at
+    from similarity import SimilarityIndex
+
+    store = get_job_store()
+    with _similarity_index_lock:
+        if _similarity_index is None:
+            _similarity_index = SimilarityIndex()
+        updated = store.updated_since(_similarity_synced_at)
+        if updated:
+            _similarity_index.add_many(job for _, job in updated)
+            _similarity_synced_at = updated[-1][0]
+        if len(_similarity_index) != store.count():
+            # Jobs were deleted by another process; start over
+            _similarity_index = SimilarityIndex()
+            updated = store.updated_since(0)
+            _similarity_index.add_many(job for _, job in updated)
+            _similarity_synced_at = updated[-1][0] if updated else 0
+        return _similarity_index
+
+def remove_tracked_job(job_id):
+    """Delete a job from the job store and the in-memory indexes; returns whether it was stored"""
+    if not get_job_store().delete(job_id):
+        return False
+    get_duplicate_index().remove(job_id)
+    with _similarity_index_lock:
+        if _similarity_index is not None:
+            _similarity_index.remove(job_id)
+    return True
+
+def find_similar_jobs(job, k=10, explain=0):
+    """Return the `k` tracked jobs most similar to `job`, best first
+    
+    Every tracked job is scored in one vectorized pass over the feature
+    index; the model is only asked to compare `job` with the top `explain`
+    matches, whose results get an 'aiComparison'.
+    """
+    store = get_job_store()
+    results = []
+    for job_id, score in get_similarity_index().top_k(job, k, exclude=job.get('id')):
+        other = store.get(job_id)
+        if other is None:
+            continue
+        result = {**other, 'similarity': round(score, 3)}
+        if len(results) < explain:
+            result['aiComparison'] = compare_jobs(job, other).get('AI Comparison')
+        results.append(result)
+    return results
@@ -0,0 +1,178 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+METRIC_PREFIX = 'linkedin_tracker_'
+
+# Stage durations of the current API request, when one is being timed
+_request_timings = ContextVar('request_timings', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f'{{{pairs}}}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels, rendered in the Prometheus text format"""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = METRIC_PREFIX + name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = dict(self._values)
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for key, value in sorted(values.items()):
+            lines.append(f'{self.name}{_label_text(self.labels, key)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in the Prometheus text format"""
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = METRIC_PREFIX + name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def render(self):
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for key, (counts, total) in sorted(values.items()):
+            for bound, count in zip(self.buckets, counts):
+                labels = _label_text(self.labels + ('le',), key + (_number(bound),))
+                lines.append(f'{self.name}_bucket{labels} {count}')
+            labels = _label_text(self.labels, key)
+            lines.append(f'{self.name}_sum{labels} {_number(total)}')
+            lines.append(f'{self.name}_count{labels} {counts[-1]}')
+        return lines
+
+
+REGISTRY = []
+
+stage_seconds = Histogram('stage_seconds', 'Time spent in each scrape stage', ('stage',))
+stage_errors = Counter('stage_errors_total', 'Exceptions raised in each scrape stage, by class', ('stage', 'error'))
+http_request_seconds = Histogram('http_request_seconds', 'API request latency', ('endpoint', 'method', 'status'))
+
+
+def record_stage(name, seconds):
+    """Record time spent in a stage, also against the current request if it is timed"""
+    stage_seconds.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name):
+    """Time a block as stage `name`, counting the class of any exception it raises"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        stage_errors.inc(stage=name, error=type(e).__name__)
+        raise
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def start_request_timing():
+    """Start collecting stage durations for the current request"""
+    _request_timings.set({})
+
+
+def request_timings():
+    """Return the stage durations collected for the current request, or None"""
+    return _request_timings.get()
+
+
+def server_timing(timings, total=None):
+    """Format stage durations (seconds) as a Server-Timing header value"""
+    entries = [f'{name.replace(" ", "_")};dur={seconds * 1000:.1f}' for name, seconds in timings.items()]
+    if total is not None:
+        entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
+
+
+def _flatten(stats, labels, samples, prefix=''):
+    for key, value in stats.items():
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)):
+            samples.setdefault(prefix + key, []).append((labels, value))
+        elif isinstance(value, dict):
+            # One nested dict per pipeline stage, route, ...: keep its key as a label
+            if all(isinstance(inner, dict) for inner in value.values()):
+                for name, inner in value.items():
+                    _flatten(inner, {**labels, 'name': name}, samples, prefix + key + '_')
+            else:
+                _flatten(value, labels, samples, prefix + key + '_')
+        elif isinstance(value, list) and all(isinstance(item, dict) for item in value):
+            for item in value:
+                # String fields (route key, proxy, ...) identify the item
+                item_labels = {name: inner for name, inner in item.items() if isinstance(inner, str)}
+                _flatten({name: inner for name, inner in item.items() if name not in item_labels},
+                         {**labels, **item_labels}, samples, prefix + key + '_')
+
+
+def component_lines(component, stats):
+    """Render a component's metrics() snapshot as gauges named after the component and key"""
+    samples = {}
+    _flatten(stats, {}, samples)
+    lines = []
+    for key, values in samples.items():
+        name = f'{METRIC_PREFIX}{component}_{key}'
+        lines.append(f'# TYPE {name} gauge')
+        for labels, value in values:
+            lines.append(f'{name}{_label_text(tuple(labels), tuple(labels.values()))} {_number(value)}')
+    return lines
+
+
+def render(extra_lines=()):
+    """Return every registered metric, then `extra_lines`, in the Prometheus text format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return '\n'.join(lines) + '\n'
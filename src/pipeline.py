@@ -0,0 +1,309 @@
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from main import DRIVER_POOL_SIZE, fetch_job_stage, parse_job_stage, analyze_job_stage, new_job_item
+from llm_engine import LLM_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# Pipeline settings
+PIPELINE_FETCH_WORKERS = int(os.getenv('PIPELINE_FETCH_WORKERS', str(DRIVER_POOL_SIZE)))
+PIPELINE_PARSE_WORKERS = int(os.getenv('PIPELINE_PARSE_WORKERS', '2'))
+PIPELINE_ANALYZE_WORKERS = int(os.getenv('PIPELINE_ANALYZE_WORKERS', str(LLM_CONCURRENCY)))
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '50'))
+BATCH_MAX_URLS = int(os.getenv('BATCH_MAX_URLS', '1000'))
+BATCH_HISTORY = int(os.getenv('BATCH_HISTORY', '100'))
+TASK_HISTORY = int(os.getenv('TASK_HISTORY', '1000'))
+
+
+class Pipeline:
+    """Chain of stages connected by bounded queues
+
+    Every stage runs its own fixed set of worker threads, so a slow stage only
+    limits its own throughput while the others keep working on the items
+    around it. Bounded queues apply backpressure: `submit` blocks once the
+    first stage is full, and a stage blocks when the next one cannot keep up.
+    """
+
+    def __init__(self, stages, queue_size=50):
+        self._stages = stages
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self._active = [0] * len(stages)
+        self._lock = threading.Lock()
+
+        for index, (name, _, workers) in enumerate(stages):
+            for n in range(workers):
+                threading.Thread(
+                    target=self._work, args=(index,), name=f"pipeline-{name}-{n}", daemon=True
+                ).start()
+
+    def _work(self, index):
+        name, func, _ = self._stages[index]
+        while True:
+            item, callback = self._queues[index].get()
+            with self._lock:
+                self._active[index] += 1
+            try:
+                item = func(item)
+            except Exception as e:
+                logger.error(f"Pipeline stage {name} failed: {e}")
+                callback(item, e)
+                continue
+            finally:
+                with self._lock:
+                    self._active[index] -= 1
+
+            if index + 1 < len(self._stages):
+                self._queues[index + 1].put((item, callback))
+            else:
+                callback(item, None)
+
+    def submit(self, item, callback):
+        """Queue an item; `callback(item, error)` runs when it leaves the pipeline"""
+        self._queues[0].put((item, callback))
+
+    def metrics(self):
+        """Return queue depth and busy workers per stage"""
+        with self._lock:
+            active = list(self._active)
+        return {
+            name: {'workers': workers, 'queued': self._queues[i].qsize(), 'active': active[i]}
+            for i, (name, _, workers) in enumerate(self._stages)
+        }
+
+
+class ScrapeBatch:
+    """Results of one batch of URLs, filled in as the pipeline finishes them"""
+
+    def __init__(self, urls):
+        self.id = uuid.uuid4().hex
+        self.urls = urls
+        self.created_at = time.time()
+        self.results = []
+        self._cond = threading.Condition()
+
+    @property
+    def done(self):
+        return len(self.results) >= len(self.urls)
+
+    def add_result(self, result):
+        with self._cond:
+            self.results.append(result)
+            self._cond.notify_all()
+
+    def iter_results(self, timeout=None):
+        """Yield results in completion order, blocking until the batch is done"""
+        sent = 0
+        while True:
+            with self._cond:
+                while sent >= len(self.results) and not self.done:
+                    if not self._cond.wait(timeout):
+                        return
+                pending = self.results[sent:]
+            for result in pending:
+                yield result
+            sent += len(pending)
+            if sent >= len(self.urls):
+                return
+
+    def snapshot(self, offset=0):
+        """Return batch progress and the results from `offset` onwards"""
+        with self._cond:
+            results = self.results[offset:]
+            failed = sum(1 for r in self.results if r.get('error'))
+            completed = len(self.results)
+        return {
+            'batchId': self.id,
+            'status': 'done' if completed >= len(self.urls) else 'running',
+            'total': len(self.urls),
+            'completed': completed,
+            'failed': failed,
+            'results': results,
+        }
+
+
+class ScrapeTask:
+    """One queued scrape; requests for a job already in flight share its task"""
+
+    def __init__(self, item):
+        self.id = uuid.uuid4().hex
+        self.url = item['url']
+        self.job_id = item['job_id']
+        self.use_langchain = item['use_langchain']
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._done = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._formatted = {}
+        self._format_lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the task finishes; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, callback):
+        """Call `callback(task)` once finished, immediately if it already is"""
+        with self._lock:
+            if not self.done:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _finish(self, result=None, error=None):
+        with self._lock:
+            self.result = result
+            self.error = error
+            self.status = 'failed' if error else 'done'
+            self.finished_at = time.time()
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.error(f"Error in task callback: {e}")
+
+    def formatted_result(self, format_result):
+        """Return `format_result(url, result)`, computed once per task and formatter
+
+        Formatters with side effects (saving the job) then run once however
+        many requests and batches share the task.
+        """
+        with self._format_lock:
+            if format_result not in self._formatted:
+                self._formatted[format_result] = format_result(self.url, self.result)
+            return self._formatted[format_result]
+
+    def to_dict(self, format_result=None):
+        data = {
+            'taskId': self.id,
+            'url': self.url,
+            'status': self.status,
+            'createdAt': self.created_at,
+            'finishedAt': self.finished_at,
+        }
+        if self.error:
+            data['error'] = self.error
+        if self.result is not None:
+            data['result'] = format_result(self.url, self.result) if format_result else self.result
+        return data
+
+
+_pipeline = None
+_intake = queue.Queue()
+_tasks = OrderedDict()
+_in_flight = {}
+_batches = OrderedDict()
+_lock = threading.Lock()
+
+
+def _dispatch():
+    """Move queued tasks into the pipeline, absorbing its backpressure"""
+    pipeline = get_scrape_pipeline()
+    while True:
+        task, item = _intake.get()
+        pipeline.submit(item, lambda item, error, task=task: _complete(task, item, error))
+
+
+def _complete(task, item, error):
+    with _lock:
+        _in_flight.pop((task.job_id, task.use_langchain), None)
+    if error is not None:
+        task._finish(error=str(error))
+    else:
+        task._finish(result=item['job_info'])
+
+
+def get_scrape_pipeline():
+    """Return the shared fetch -> parse -> analyze pipeline, starting it on first use"""
+    global _pipeline
+    with _lock:
+        if _pipeline is None:
+            _pipeline = Pipeline([
+                ('fetch', fetch_job_stage, PIPELINE_FETCH_WORKERS),
+                ('parse', parse_job_stage, PIPELINE_PARSE_WORKERS),
+                ('analyze', analyze_job_stage, PIPELINE_ANALYZE_WORKERS),
+            ], queue_size=PIPELINE_QUEUE_SIZE)
+            threading.Thread(target=_dispatch, name='pipeline-dispatch', daemon=True).start()
+        return _pipeline
+
+
+def submit_task(url, use_langchain=True):
+    """Queue a scrape without blocking and return (task, deduplicated)
+
+    While a job is queued or running, further requests for any URL of the
+    same LinkedIn job are attached to the existing task.
+    """
+    get_scrape_pipeline()
+    item = new_job_item(url, use_langchain)
+    key = (item['job_id'], use_langchain)
+
+    with _lock:
+        task = _in_flight.get(key)
+        if task is not None:
+            return task, True
+
+        task = ScrapeTask(item)
+        _in_flight[key] = task
+        _tasks[task.id] = task
+        while len(_tasks) > TASK_HISTORY:
+            _tasks.popitem(last=False)
+
+    _intake.put((task, item))
+    return task, False
+
+
+def get_task(task_id):
+    """Return a task by ID, or None if unknown or no longer retained"""
+    with _lock:
+        return _tasks.get(task_id)
+
+
+def get_batch(batch_id):
+    """Return a batch by ID, or None if unknown or no longer retained"""
+    with _lock:
+        return _batches.get(batch_id)
+
+
+def submit_batch(urls, use_langchain=True, format_result=None):
+    """Start scraping a list of job URLs and return the ScrapeBatch tracking them
+
+    URLs that point at the same LinkedIn job are scraped once. Results are
+    passed through `format_result(url, job_info)` when given, once per task
+    however many batches and requests share it.
+    """
+    unique = OrderedDict()
+    for url in urls:
+        unique.setdefault(new_job_item(url)['job_id'], url)
+
+    batch = ScrapeBatch(list(unique.values()))
+    with _lock:
+        _batches[batch.id] = batch
+        while len(_batches) > BATCH_HISTORY:
+            _batches.popitem(last=False)
+
+    def on_done(url, task):
+        if task.error:
+            batch.add_result({'url': url, 'error': task.error})
+        elif format_result:
+            batch.add_result(task.formatted_result(format_result))
+        else:
+            batch.add_result(task.result)
+
+    for url in batch.urls:
+        task, _ = submit_task(url, use_langchain)
+        task.add_done_callback(lambda task, url=url: on_done(url, task))
+    return batch
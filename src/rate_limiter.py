@@ -0,0 +1,295 @@
+import logging
+import os
+import threading
+import time
+
+from metrics import record_stage
+
+logger = logging.getLogger(__name__)
+
+# Request rate per route (key and proxy), adapted between the minimum and
+# maximum: halved on every throttle signal, raised a step on every success
+RATE_LIMIT_PER_MINUTE = float(os.getenv('RATE_LIMIT_PER_MINUTE', '30'))
+RATE_LIMIT_MIN_PER_MINUTE = float(os.getenv('RATE_LIMIT_MIN_PER_MINUTE', '2'))
+RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', '3'))
+
+# Pause after a throttle signal, doubled for each consecutive one
+RATE_BACKOFF_SECONDS = float(os.getenv('RATE_BACKOFF_SECONDS', '30'))
+RATE_BACKOFF_MAX_SECONDS = float(os.getenv('RATE_BACKOFF_MAX_SECONDS', '900'))
+
+# Longest a request waits for a route before giving up with RateLimitTimeout
+RATE_LIMIT_WAIT_SECONDS = float(os.getenv('RATE_LIMIT_WAIT_SECONDS', '30'))
+
+# Consecutive errors (timeouts, refused connections) before a route is paused
+RATE_MAX_ERRORS = int(os.getenv('RATE_MAX_ERRORS', '3'))
+
+# Weight of the newest sample in the latency and failure rate averages
+_EWMA_ALPHA = 0.2
+
+# Matches any proxy in lease() and pick_proxy()
+ANY_PROXY = object()
+
+
+class RateLimitTimeout(Exception):
+    """Raised when no route frees up within the lease timeout; retry after `retry_after` seconds"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def proxy_url(proxy):
+    """Return a proxy address with a scheme, as requests and Chrome expect it"""
+    return proxy if '://' in proxy else f'http://{proxy}'
+
+
+class Route:
+    """Token bucket and health record of one (key, proxy) pair"""
+
+    def __init__(self, key, proxy, rate, burst):
+        self.key = key
+        self.proxy = proxy
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.backoff_until = 0.0
+        self.strikes = 0
+        self.errors = 0
+        self.latency = None
+        self.failure_rate = 0.0
+        self.stats = {'requests': 0, 'successes': 0, 'errors': 0, 'throttled': 0, 'wait_seconds_total': 0.0}
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until this route may send its next request"""
+        wait = max(0.0, self.backoff_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def score(self):
+        """Lower is healthier: average latency inflated by the failure rate"""
+        return (self.latency or 0.0) * (1 + 4 * self.failure_rate) + self.failure_rate
+
+    def to_dict(self, now):
+        return {
+            'key': self.key,
+            'proxy': self.proxy,
+            'rate_per_minute': round(self.rate * 60, 2),
+            'tokens': round(self.tokens, 2),
+            'backoff_seconds': round(max(0.0, self.backoff_until - now), 1),
+            'latency_seconds': self.latency,
+            'failure_rate': round(self.failure_rate, 3),
+            **self.stats,
+        }
+
+
+class Lease:
+    """Permission to send one request over a route; reports how it went on exit
+
+    Call `throttled(reason)` when the response shows the route is being
+    limited (HTTP 429, a login wall, a CAPTCHA). Leaving the block with an
+    exception counts as an error, leaving it normally as a success.
+    """
+
+    def __init__(self, limiter, route):
+        self._limiter = limiter
+        self._route = route
+        self._started = None
+        self._reported = False
+        self.proxy = route.proxy
+
+    @property
+    def proxies(self):
+        """The proxy as a requests `proxies` mapping, or None for a direct connection"""
+        if self.proxy is None:
+            return None
+        return {'http': proxy_url(self.proxy), 'https': proxy_url(self.proxy)}
+
+    def bind(self, proxy):
+        """Move the lease to the same key's route over `proxy` and restart its clock
+
+        For a request sent over a resource picked after the lease was taken,
+        such as a pooled browser started with its own proxy.
+        """
+        if proxy != self.proxy:
+            self._route = self._limiter._transfer(self._route, proxy)
+            self.proxy = proxy
+        self._started = time.monotonic()
+
+    def cancel(self):
+        """Give the token back without recording a result, when no request was sent"""
+        if not self._reported:
+            self._reported = True
+            self._limiter._refund(self._route)
+
+    def throttled(self, reason, retry_after=None):
+        if not self._reported:
+            self._reported = True
+            self._limiter._throttle(self._route, reason, retry_after)
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._reported:
+            self._reported = True
+            self._limiter._record(self._route, time.monotonic() - self._started, failed=exc_type is not None)
+        return False
+
+
+class RateLimiter:
+    """Adaptive token-bucket scheduler over proxies
+
+    Every (key, proxy) route has its own bucket, where a key is a host or
+    any separately limited identity such as a logged-in browser session.
+    `lease()` hands out the healthiest route that may send right away,
+    scored by average latency and failure rate, and otherwise waits for the
+    first route to free up instead of sleeping a fixed time. Throttle
+    signals halve a route's rate and pause it with exponential backoff;
+    successes raise the rate back step by step (AIMD).
+    """
+
+    def __init__(self, proxies=(), rate_per_minute=RATE_LIMIT_PER_MINUTE, burst=RATE_LIMIT_BURST,
+                 min_rate_per_minute=RATE_LIMIT_MIN_PER_MINUTE, backoff=RATE_BACKOFF_SECONDS,
+                 max_backoff=RATE_BACKOFF_MAX_SECONDS, max_errors=RATE_MAX_ERRORS):
+        self.proxies = [proxy for proxy in proxies if proxy] or [None]
+        self.max_rate = rate_per_minute / 60
+        self.min_rate = min(min_rate_per_minute / 60, self.max_rate)
+        self.burst = burst
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_errors = max_errors
+
+        self._routes = {}
+        self._cond = threading.Condition()
+
+    def _routes_for(self, key, proxy):
+        proxies = self.proxies if proxy is ANY_PROXY else [proxy]
+        routes = []
+        for candidate in proxies:
+            route = self._routes.get((key, candidate))
+            if route is None:
+                route = self._routes[(key, candidate)] = Route(key, candidate, self.max_rate, self.burst)
+            routes.append(route)
+        return routes
+
+    def lease(self, key, proxy=ANY_PROXY, timeout=None):
+        """Wait for a route to `key` that may send now and return a Lease for it
+
+        Pass `proxy` to pin the route, e.g. for a browser started with that
+        proxy. Raises RateLimitTimeout after `timeout` seconds; request
+        paths pass RATE_LIMIT_WAIT_SECONDS.
+        """
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                routes = self._routes_for(key, proxy)
+                for route in routes:
+                    route.refill(now)
+                ready = [route for route in routes if route.wait_time(now) <= 0]
+                if ready:
+                    route = min(ready, key=Route.score)
+                    route.tokens -= 1
+                    route.stats['requests'] += 1
+                    route.stats['wait_seconds_total'] += now - started
+                    break
+                wait = min(route.wait_time(now) for route in routes)
+                if deadline is not None:
+                    if now + wait > deadline:
+                        raise RateLimitTimeout(f"No route to {key} free within {timeout}s", wait)
+                self._cond.wait(wait)
+        record_stage('rate_limit_wait', now - started)
+        return Lease(self, route)
+
+    def pick_proxy(self, key):
+        """Return the healthiest proxy for `key` that is not backing off, without taking a token"""
+        with self._cond:
+            now = time.monotonic()
+            routes = self._routes_for(key, ANY_PROXY)
+            open_routes = [route for route in routes if route.backoff_until <= now] or routes
+            return min(open_routes, key=lambda route: (route.score(), route.backoff_until)).proxy
+
+    def _refund(self, route):
+        with self._cond:
+            route.tokens += 1
+            route.stats['requests'] -= 1
+            self._cond.notify_all()
+
+    def _transfer(self, route, proxy):
+        """Move a taken token to the same key's route over `proxy`, which may go into debt"""
+        with self._cond:
+            route.tokens += 1
+            route.stats['requests'] -= 1
+            target = self._routes_for(route.key, proxy)[0]
+            target.refill(time.monotonic())
+            target.tokens -= 1
+            target.stats['requests'] += 1
+            self._cond.notify_all()
+            return target
+
+    def _record(self, route, latency, failed):
+        with self._cond:
+            route.latency = latency if route.latency is None else (
+                _EWMA_ALPHA * latency + (1 - _EWMA_ALPHA) * route.latency
+            )
+            route.failure_rate = _EWMA_ALPHA * failed + (1 - _EWMA_ALPHA) * route.failure_rate
+            if not failed:
+                route.stats['successes'] += 1
+                route.strikes = 0
+                route.errors = 0
+                route.rate = min(self.max_rate, route.rate + self.max_rate / 20)
+                return
+
+            route.stats['errors'] += 1
+            route.errors += 1
+            if route.errors >= self.max_errors:
+                # Likely a dead proxy; stop routing work to it for a while
+                self._pause(route, 'repeated errors', None)
+                route.errors = 0
+
+    def _throttle(self, route, reason, retry_after):
+        with self._cond:
+            route.stats['throttled'] += 1
+            route.stats[f'throttled_{reason}'] = route.stats.get(f'throttled_{reason}', 0) + 1
+            route.failure_rate = _EWMA_ALPHA + (1 - _EWMA_ALPHA) * route.failure_rate
+            route.rate = max(self.min_rate, route.rate / 2)
+            self._pause(route, reason, retry_after)
+
+    def _pause(self, route, reason, retry_after):
+        """Back a route off; the caller holds the lock"""
+        route.strikes += 1
+        delay = retry_after if retry_after else min(self.max_backoff, self.backoff * 2 ** (route.strikes - 1))
+        route.backoff_until = time.monotonic() + delay
+        route.tokens = min(route.tokens, 0)
+        logger.warning(f"Backing off {route.key} via {route.proxy or 'direct'} for {delay:.0f}s ({reason})")
+        self._cond.notify_all()
+
+    def metrics(self):
+        """Return the state and counters of every route"""
+        with self._cond:
+            now = time.monotonic()
+            return {
+                'max_rate_per_minute': self.max_rate * 60,
+                'routes': [route.to_dict(now) for route in self._routes.values()],
+            }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the shared rate limiter over PROXY_LIST, creating it on first use"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(proxies=os.getenv('PROXY_LIST', '').split(','))
+        return _limiter
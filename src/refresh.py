@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from job_store import ANALYSIS_FIELDS, PAGE_FIELDS, description_hash, page_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Refresh settings: every REFRESH_INTERVAL seconds, up to REFRESH_BUDGET open
+# jobs not refreshed for REFRESH_MAX_AGE seconds are re-fetched
+REFRESH_INTERVAL = int(os.getenv('REFRESH_INTERVAL', '900'))
+REFRESH_BUDGET = int(os.getenv('REFRESH_BUDGET', '100'))
+REFRESH_MAX_AGE = int(os.getenv('REFRESH_MAX_AGE', '86400'))
+REFRESH_WORKERS = int(os.getenv('REFRESH_WORKERS', '2'))
+
+# Values the extractor uses for fields missing from a page
+MISSING_VALUES = (None, '', 'Not specified', 'Not available')
+
+
+class RefreshScheduler:
+    """Re-fetches tracked jobs on a budgeted cadence and logs what changed
+
+    A refreshed page is compared with the stored job by fingerprint first,
+    so unchanged postings cost one fetch and one parse. Only changed pages
+    are diffed field by field, and the AI analysis only runs again when the
+    description hash changed. Closed postings are no longer refreshed.
+
+    Due jobs are claimed in the store, so a scheduler in every API worker
+    does not multiply the fetches.
+
+    `fetch_fields(url)` returns the freshly scraped job fields and
+    `analyze(url, description)` the analysis fields for a new description,
+    empty or holding only the raw 'AI Analysis' when it failed.
+    """
+
+    def __init__(self, store, fetch_fields, analyze, interval=REFRESH_INTERVAL, budget=REFRESH_BUDGET,
+                 max_age=REFRESH_MAX_AGE, workers=REFRESH_WORKERS):
+        self.store = store
+        self.fetch_fields = fetch_fields
+        self.analyze = analyze
+        self.interval = interval
+        self.budget = budget
+        self.max_age = max_age
+        self.workers = workers
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='refresh')
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'runs': 0,
+            'refreshed': 0,
+            'unchanged': 0,
+            'changed': 0,
+            'reanalyzed': 0,
+            'reanalysis_failed': 0,
+            'closed': 0,
+            'failed': 0,
+            'last_run_at': None,
+            'last_run_seconds': 0.0,
+        }
+
+    def refresh(self, job):
+        """Re-scrape one stored job and return its list of (field, old, new) changes"""
+        fields = self.fetch_fields(job['url'])
+
+        # Fields missing from the new page keep their stored value
+        values = {
+            key: fields[field]
+            for key, field, _ in PAGE_FIELDS
+            if fields.get(field) not in MISSING_VALUES
+        }
+        values['closed'] = bool(fields.get('Closed'))
+        current = {**job, **values}
+
+        stored = self.store.refresh_state(job['id'])
+        fingerprint, stored_description_hash = stored or (page_fingerprint(job), description_hash(job.get('description')))
+        if page_fingerprint(current) == fingerprint:
+            self.store.touch_refresh(job['id'])
+            self._count('unchanged')
+            return []
+
+        state = None
+        if description_hash(current.get('description')) != stored_description_hash:
+            analysis = self.analyze(job['url'], current['description'])
+            if analysis and 'AI Analysis' not in analysis:
+                values.update({key: analysis[field] for key, field, _ in ANALYSIS_FIELDS if field in analysis})
+                self._count('reanalyzed')
+            else:
+                # Keep the old fingerprints so the next refresh analyzes the description again
+                state = (fingerprint, stored_description_hash)
+                self._count('reanalysis_failed')
+
+        changes = self.store.apply_refresh(job['id'], values, state)
+        self._count('changed')
+        if values['closed'] and not job.get('closed'):
+            self._count('closed')
+        for field, old, new in changes:
+            logger.info(f"Job {job['id']} changed {field}: {old!r} -> {new!r}")
+        return changes
+
+    def _refresh_safely(self, job):
+        try:
+            self.refresh(job)
+        except Exception as e:
+            logger.error(f"Error refreshing job {job.get('id')}: {str(e)}")
+            self.store.touch_refresh(job['id'], failed=True)
+            self._count('failed')
+            return
+        self._count('refreshed')
+
+    def run_once(self):
+        """Refresh the stalest due jobs, up to the budget; returns how many were attempted"""
+        started = time.monotonic()
+        jobs = self.store.claim_due_refresh(time.time() - self.max_age, self.budget)
+        list(self._executor.map(self._refresh_safely, jobs))
+        with self._lock:
+            self._stats['runs'] += 1
+            self._stats['last_run_at'] = time.time()
+            self._stats['last_run_seconds'] = time.monotonic() - started
+        return len(jobs)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Error in refresh run: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start refreshing in a background thread"""
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='refresh-scheduler', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop the background thread after its current run"""
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def metrics(self):
+        """Return refresh counters and the settings in use"""
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            'running': self._thread is not None,
+            'interval': self.interval,
+            'budget': self.budget,
+            'max_age': self.max_age,
+            **stats,
+        }
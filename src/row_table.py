@@ -0,0 +1,82 @@
+import numpy as np
+
+# Removed rows are dropped once there are at least this many and they
+# outnumber the live ones
+COMPACT_MIN_DEAD_ROWS = 1024
+
+
+class RowTable:
+    """Keyed rows of NumPy columns, shared by the in-memory job indexes
+
+    Each key keeps its row for as long as it is stored, so re-adding a key
+    overwrites its values in place. Columns grow geometrically, and rows
+    of removed keys stay in place, marked dead, until they outnumber the
+    live ones and are compacted away. The caller serializes access.
+
+    `columns` maps a column name to (dtype, fill value, shape of one row).
+    """
+
+    def __init__(self, columns):
+        self._specs = dict(columns)
+        self.columns = {
+            name: np.full((0, *shape), fill, dtype=dtype) for name, (dtype, fill, shape) in self._specs.items()
+        }
+        self.keys = []
+        self.rows = {}
+        self.live = np.zeros(0, dtype=bool)
+        self.size = 0
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _grow(self, needed):
+        capacity = max(needed, 2 * len(self.live), 1024)
+        for name, (dtype, fill, shape) in self._specs.items():
+            column = np.full((capacity, *shape), fill, dtype=dtype)
+            column[:self.size] = self.columns[name][:self.size]
+            self.columns[name] = column
+        live = np.zeros(capacity, dtype=bool)
+        live[:self.size] = self.live[:self.size]
+        self.live = live
+
+    def assign(self, keys):
+        """Return the row of each key, appending rows for new keys, and mark them live"""
+        new_keys = [key for key in dict.fromkeys(keys) if key not in self.rows]
+        if self.size + len(new_keys) > len(self.live):
+            self._grow(self.size + len(new_keys))
+        for key in new_keys:
+            self.rows[key] = self.size
+            self.keys.append(key)
+            self.size += 1
+        rows = np.fromiter((self.rows[key] for key in keys), dtype=np.int64, count=len(keys))
+        self.live[rows] = True
+        return rows
+
+    def remove(self, key):
+        """Mark a key's row dead and return it, or None if the key is unknown
+
+        Call `compact()` afterwards when `needs_compaction()` says so, once
+        the caller has cleared anything else it keeps for the row.
+        """
+        row = self.rows.pop(key, None)
+        if row is not None:
+            self.live[row] = False
+        return row
+
+    def needs_compaction(self):
+        dead = self.size - len(self.rows)
+        return dead >= COMPACT_MIN_DEAD_ROWS and dead > len(self.rows)
+
+    def compact(self):
+        """Drop dead rows and renumber the rest; returns the old row of each new one"""
+        kept = np.flatnonzero(self.live[:self.size])
+        for name in self._specs:
+            self.columns[name] = self.columns[name][kept]
+        self.live = np.ones(len(kept), dtype=bool)
+        self.keys = [self.keys[row] for row in kept]
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self.size = len(kept)
+        return kept
@@ -0,0 +1,110 @@
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from extractor import search_card_extractor
+from job_cache import canonical_job_url, normalize_job_id
+
+logger = logging.getLogger(__name__)
+
+# Search settings
+SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', '25'))
+SEARCH_WORKERS = int(os.getenv('SEARCH_WORKERS', '4'))
+SEARCH_MAX_PAGES = int(os.getenv('SEARCH_MAX_PAGES', '40'))
+
+SEARCH_URL = 'https://www.linkedin.com/jobs/search/'
+
+# Shared page fetchers, created on first use
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def search_params(keywords, location, job_type=None, experience_level=None):
+    """Return the query parameters of a LinkedIn job search"""
+    params = {'keywords': keywords, 'location': location}
+    if job_type:
+        params['f_JT'] = job_type
+    if experience_level:
+        params['f_E'] = experience_level
+    return params
+
+
+def search_page_url(params, start):
+    """Return the URL of the search results page starting at offset `start`"""
+    return f"{SEARCH_URL}?{urlencode({**params, 'start': start})}"
+
+
+def parse_search_cards(html):
+    """Extract every job card on a search results page in one pass"""
+    cards = []
+    for card in search_card_extractor.extract_all(html):
+        # Cards LinkedIn has not rendered yet are empty placeholders
+        if not card['URL']:
+            continue
+        card['URL'] = canonical_job_url(card['URL'])
+        cards.append(card)
+    return cards
+
+
+def get_search_executor():
+    """Return the shared thread pool that fetches search pages"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix='search')
+        return _executor
+
+
+def iter_search_results(params, fetch_page, max_pages=3, workers=SEARCH_WORKERS):
+    """Yield the job cards of a search as soon as each page is parsed
+
+    Pages are requested by `start=` offset, with up to `workers` pages being
+    fetched and parsed ahead of the one currently being yielded, so results
+    stay in LinkedIn's order while pages load in parallel. `fetch_page(params,
+    start)` returns a page's HTML. The crawl stops at `max_pages` or at the
+    first page with no new jobs; a page that fails raises its error once the
+    cards of the pages before it have been yielded.
+    """
+    executor = get_search_executor()
+    pending = deque()
+    next_page = 0
+    seen = set()
+
+    def submit():
+        nonlocal next_page
+        start = next_page * SEARCH_PAGE_SIZE
+        pending.append((next_page, executor.submit(lambda: parse_search_cards(fetch_page(params, start)))))
+        next_page += 1
+
+    try:
+        while next_page < min(max_pages, workers):
+            submit()
+
+        while pending:
+            page, future = pending.popleft()
+            try:
+                cards = future.result()
+            except Exception as e:
+                logger.error(f"Error processing search page {page + 1}: {str(e)}")
+                raise
+
+            new_cards = []
+            for card in cards:
+                job_id = normalize_job_id(card['URL'])
+                if job_id not in seen:
+                    seen.add(job_id)
+                    new_cards.append(card)
+            if not new_cards:
+                logger.info("No more search results")
+                break
+
+            if next_page < max_pages:
+                submit()
+            yield from new_cards
+    finally:
+        # Stopped early or abandoned by the consumer; drop pages not started
+        for _, future in pending:
+            future.cancel()
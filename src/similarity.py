@@ -0,0 +1,267 @@
+import math
+import re
+import threading
+
+import numpy as np
+
+from job_store import ANALYSIS_FIELDS
+from row_table import RowTable
+
+# Weight of each feature in a similarity score. Features unknown for either
+# job are left out and the remaining weights rescaled.
+SIMILARITY_WEIGHTS = {
+    'skills': 0.6,
+    'experience': 0.15,
+    'work_mode': 0.1,
+    'salary': 0.15,
+}
+
+# Experience levels on one scale, matched by keyword, most senior first
+# so LinkedIn's "Mid-Senior level" counts as senior
+EXPERIENCE_LEVELS = (
+    (5, ('director', 'executive', 'vp', 'head of', 'chief')),
+    (4, ('lead', 'principal', 'staff', 'architect')),
+    (3, ('senior', 'sr')),
+    (2, ('mid', 'associate', 'intermediate')),
+    (1, ('entry', 'junior', 'jr', 'graduate')),
+    (0, ('intern',)),
+)
+MAX_EXPERIENCE_LEVEL = 5
+
+# Work modes, hybrid first since it is often described with the others
+WORK_MODES = (
+    (1, ('hybrid',)),
+    (0, ('remote',)),
+    (2, ('onsite', 'on-site', 'on site', 'office', 'in-person', 'in person')),
+)
+
+# A salary this many times another scores 0 on the salary feature
+SALARY_RATIO_SPAN = 2.0
+
+_SALARY_NUMBER = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([kK])?')
+_SALARY_PERIODS = (('hour', 2080), ('hr', 2080), ('day', 260), ('week', 52), ('month', 12))
+_SKILL_SEPARATORS = re.compile(r'[\s_]+')
+
+
+def _value(job, key):
+    """Return an analysis value from a stored job object or a scraped job_info dict"""
+    for object_key, field, _ in ANALYSIS_FIELDS:
+        if object_key == key:
+            return job.get(key, job.get(field))
+    return job.get(key)
+
+
+def normalize_skill(skill):
+    """Return the comparable form of a skill name"""
+    return _SKILL_SEPARATORS.sub(' ', str(skill).strip().lower().rstrip('.'))
+
+
+def _keyword_code(text, table):
+    if not isinstance(text, str):
+        return None
+    text = text.lower()
+    for code, keywords in table:
+        if any(re.search(rf'\b{re.escape(keyword)}\b', text) for keyword in keywords):
+            return code
+    return None
+
+
+def experience_code(text):
+    """Return a position on the experience scale, or None when unknown"""
+    return _keyword_code(text, EXPERIENCE_LEVELS)
+
+
+def work_mode_code(text):
+    """Return 0 (remote), 1 (hybrid) or 2 (onsite), or None when unknown"""
+    return _keyword_code(text, WORK_MODES)
+
+
+def parse_salary(text):
+    """Return the yearly midpoint of a salary range such as "$80k - $100k", or None"""
+    if not isinstance(text, str):
+        return None
+    values = []
+    for number, thousands in _SALARY_NUMBER.findall(text):
+        value = float(number.replace(',', ''))
+        if thousands:
+            value *= 1000
+        values.append(value)
+    if not values:
+        return None
+    midpoint = (min(values) + max(values)) / 2
+    lowered = text.lower()
+    for period, multiplier in _SALARY_PERIODS:
+        if re.search(rf'\b{period}', lowered):
+            midpoint *= multiplier
+            break
+    return midpoint if midpoint >= 1000 else None
+
+
+def job_features(job):
+    """Return the comparable features of a job: (skills, experience, work mode, salary)"""
+    skills = _value(job, 'skills') or []
+    if isinstance(skills, str):
+        skills = [skills]
+    return (
+        {normalize_skill(skill) for skill in skills if str(skill).strip()},
+        experience_code(_value(job, 'experienceLevel')),
+        work_mode_code(_value(job, 'workMode')),
+        parse_salary(_value(job, 'salaryRange')),
+    )
+
+
+class SimilarityIndex:
+    """Feature vectors of tracked jobs, scored against one job in a single pass
+
+    Each job is reduced to its set of skills, a position on the experience
+    scale, a work mode and a log salary midpoint. Skills are kept in an
+    inverted index (skill -> rows), so the skill overlap with every job is
+    one scatter-add per query skill; the other features are NumPy columns.
+    Scores are weighted by SIMILARITY_WEIGHTS and lie between 0 and 1.
+    """
+
+    def __init__(self, weights=None):
+        self.weights = dict(weights or SIMILARITY_WEIGHTS)
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._posting_arrays = {}
+        self._table = RowTable({
+            'skills': (object, None, ()),
+            'skill_counts': (np.float32, 0, ()),
+            'experience': (np.float32, np.nan, ()),
+            'work_mode': (np.int8, -1, ()),
+            'salary': (np.float32, np.nan, ()),
+        })
+
+    def add_many(self, jobs):
+        """Index job objects by their 'id', overwriting the rows of jobs already indexed"""
+        jobs = list(jobs)
+        with self._lock:
+            table = self._table
+            rows = table.assign([job['id'] for job in jobs])
+            for row, job in zip(rows.tolist(), jobs):
+                skills, experience, work_mode, salary = job_features(job)
+                self._set_skills(row, skills)
+                table['skill_counts'][row] = len(skills)
+                table['experience'][row] = np.nan if experience is None else experience
+                table['work_mode'][row] = -1 if work_mode is None else work_mode
+                table['salary'][row] = np.nan if salary is None else math.log(salary)
+
+    def add(self, job):
+        self.add_many([job])
+
+    def _set_skills(self, row, skills):
+        """Point the inverted index at a row's new skills; the caller holds the lock"""
+        old = self._table['skills'][row] or set()
+        for skill in old - skills:
+            postings = self._postings[skill]
+            postings.discard(row)
+            if not postings:
+                del self._postings[skill]
+            self._posting_arrays.pop(skill, None)
+        for skill in skills - old:
+            self._postings.setdefault(skill, set()).add(row)
+            self._posting_arrays.pop(skill, None)
+        self._table['skills'][row] = skills
+
+    def remove(self, key):
+        with self._lock:
+            row = self._table.remove(key)
+            if row is not None:
+                self._set_skills(row, set())
+                if self._table.needs_compaction():
+                    self._compact()
+
+    def _compact(self):
+        """Compact the table and rebuild the inverted index for the new rows; the caller holds the lock"""
+        self._table.compact()
+        self._postings = {}
+        self._posting_arrays = {}
+        for row, skills in enumerate(self._table['skills']):
+            for skill in skills:
+                self._postings.setdefault(skill, set()).add(row)
+
+    def _posting_array(self, skill):
+        array = self._posting_arrays.get(skill)
+        if array is None:
+            postings = self._postings.get(skill, ())
+            array = np.fromiter(postings, dtype=np.int64, count=len(postings))
+            self._posting_arrays[skill] = array
+        return array
+
+    def _scores(self, job):
+        """Return (rows, scores) of every live indexed job against `job`; the caller holds the lock"""
+        skills, experience, work_mode, salary = job_features(job)
+        table = self._table
+        size = table.size
+        total = np.zeros(size, dtype=np.float32)
+        weight = np.zeros(size, dtype=np.float32)
+
+        if skills:
+            # Cosine similarity of binary skill vectors
+            overlap = np.zeros(size, dtype=np.float32)
+            for skill in skills:
+                overlap[self._posting_array(skill)] += 1
+            counts = table['skill_counts'][:size]
+            known = counts > 0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cosine = overlap / np.sqrt(counts * len(skills))
+            total += np.where(known, cosine, 0) * self.weights['skills']
+            weight += known * self.weights['skills']
+
+        if experience is not None:
+            levels = table['experience'][:size]
+            known = ~np.isnan(levels)
+            closeness = 1 - np.abs(levels - experience) / MAX_EXPERIENCE_LEVEL
+            total += np.where(known, closeness, 0) * self.weights['experience']
+            weight += known * self.weights['experience']
+
+        if work_mode is not None:
+            modes = table['work_mode'][:size]
+            known = modes >= 0
+            total += (modes == work_mode) * self.weights['work_mode']
+            weight += known * self.weights['work_mode']
+
+        if salary is not None:
+            salaries = table['salary'][:size]
+            known = ~np.isnan(salaries)
+            closeness = np.clip(1 - np.abs(salaries - math.log(salary)) / math.log(SALARY_RATIO_SPAN), 0, 1)
+            total += np.where(known, closeness, 0) * self.weights['salary']
+            weight += known * self.weights['salary']
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(weight > 0, total / weight, 0)
+        rows = np.flatnonzero(table.live[:size])
+        return rows, scores[rows]
+
+    def top_k(self, job, k=10, exclude=None):
+        """Return the [(key, score)] of the `k` indexed jobs most similar to `job`, best first"""
+        with self._lock:
+            rows, scores = self._scores(job)
+            if exclude is not None and exclude in self._table.rows:
+                keep = rows != self._table.rows[exclude]
+                rows, scores = rows[keep], scores[keep]
+            if k < len(scores):
+                best = np.argpartition(-scores, k)[:k]
+                rows, scores = rows[best], scores[best]
+            order = np.argsort(-scores, kind='stable')
+            return [(self._table.keys[rows[i]], float(scores[i])) for i in order]
+
+    def rank(self, job, exclude=None):
+        """Return every indexed job as [(key, score)], most similar first"""
+        return self.top_k(job, k=len(self), exclude=exclude)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._table.rows
+
+    def __len__(self):
+        with self._lock:
+            return len(self._table)
+
+
+def job_similarity(job1, job2):
+    """Return the feature similarity score of two jobs"""
+    index = SimilarityIndex()
+    index.add({**job2, 'id': None})
+    return index.top_k(job1, k=1)[0][1]
@@ -0,0 +1,28 @@
+import sqlite3
+import threading
+
+
+class ThreadConnections:
+    """One SQLite connection per thread to a database file shared by workers
+
+    Connections run in WAL mode, so every thread and worker process can read
+    while one writes, with synchronous=NORMAL. `pragmas` (e.g.
+    'cache_size=-65536') are applied to each new connection after those.
+    """
+
+    def __init__(self, path, pragmas=()):
+        self.path = path
+        self.pragmas = tuple(pragmas)
+        self._local = threading.local()
+
+    def get(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            for pragma in self.pragmas:
+                conn.execute(f'PRAGMA {pragma}')
+            self._local.conn = conn
+        return conn